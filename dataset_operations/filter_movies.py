@@ -2,6 +2,11 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from genre_bitmask import encode_genres, genre_distribution
+from text_sidecar import write_text_sidecar
+
+TEXT_COLUMNS = ['title', 'overview']
+
 def filter_movies():
     print("Starting movie filtering process...")
     
@@ -17,12 +22,30 @@ def filter_movies():
         print("\nMain dataset columns:")
         print(main_df.columns.tolist())
         
-        if len(main_df) != len(emotion_df):
-            raise ValueError("Datasets have different lengths!")
+        # Carry the TMDB id into the emotion vectors so clients can fetch
+        # details by id instead of searching by title/year
+        if 'id' in emotion_df.columns:
+            # Vectors may come merged from shards (not in dataset order) or without
+            # quarantined rows; align them to the main dataset by id
+            emotion_df['id'] = emotion_df['id'].astype('Int64')
+            if emotion_df['id'].isna().any() or emotion_df['id'].duplicated().any():
+                raise ValueError("Emotion vectors have missing or duplicate ids!")
+            has_vector = main_df['id'].astype('Int64').isin(emotion_df['id'])
+            if not has_vector.all():
+                print(f"Dropping {(~has_vector).sum()} movies without emotion vectors (quarantined)")
+            main_df = main_df[has_vector & ~main_df['id'].duplicated()].reset_index(drop=True)
+            emotion_df = emotion_df.set_index('id').reindex(main_df['id'].astype('Int64')).reset_index()
+        else:
+            if len(main_df) != len(emotion_df):
+                raise ValueError("Datasets have different lengths!")
+            emotion_df.insert(0, 'id', main_df['id'].astype('Int64'))
             
         # Convert release_date to year
         main_df['release_year'] = pd.to_datetime(main_df['release_date']).dt.year
         
+        # Encode genres once into a bitmask shared with the analyzer
+        main_df['genre_mask'] = encode_genres(main_df['genres'])
+        
     except Exception as e:
         print(f"Error reading datasets: {e}")
         return
@@ -116,18 +139,20 @@ def filter_movies():
     print(f"Average runtime: {filtered_main['runtime'].mean():.2f} minutes")
     
     # Print genre distribution
-    if 'genres' in filtered_main.columns:
-        print("\nTop genres in filtered dataset:")
-        genres = filtered_main['genres'].str.split('|').explode()
-        print(genres.value_counts().head(10))
+    print("\nTop genres in filtered dataset:")
+    print(genre_distribution(filtered_main['genre_mask']).head(10))
     
     # Save filtered datasets
     print("\nSaving filtered datasets...")
     try:
         # Remove unnecessary columns before saving
-        columns_to_keep = ['id', 'title', 'vote_average', 'vote_count', 'release_year', 
-                          'runtime', 'popularity', 'genres', 'overview']
+        columns_to_keep = ['id', 'vote_average', 'vote_count', 'release_year', 
+                          'runtime', 'popularity', 'genres', 'genre_mask']
         filtered_main[columns_to_keep].to_csv('../client/dataset/main_dataset_filtered.csv', index=False)
+        
+        # Text columns go to a compressed sidecar in the same row order, so numeric
+        # consumers skip them and display code loads only the rows it shows
+        write_text_sidecar(filtered_main, TEXT_COLUMNS, '../client/dataset/main_dataset_filtered')
         filtered_emotion.to_csv('../client/dataset/emotion_vectors_filtered.csv', index=False)
         print("Filtered datasets saved successfully!")
         
@@ -0,0 +1,71 @@
+import pandas as pd
+import numpy as np
+import re
+from typing import Iterable, List
+
+# TMDB genres known to the analyzer; list position is the bit in a genre mask
+GENRES = [
+    (28, 'Action'),
+    (12, 'Adventure'),
+    (16, 'Animation'),
+    (35, 'Comedy'),
+    (80, 'Crime'),
+    (99, 'Documentary'),
+    (18, 'Drama'),
+    (10751, 'Family'),
+    (14, 'Fantasy'),
+    (36, 'History'),
+    (27, 'Horror'),
+    (10402, 'Music'),
+    (9648, 'Mystery'),
+    (10749, 'Romance'),
+    (878, 'Science Fiction'),
+    (53, 'Thriller'),
+    (10752, 'War'),
+    (37, 'Western')
+]
+
+GENRE_NAME_TO_ID = {name: genre_id for genre_id, name in GENRES}
+GENRE_ID_TO_NAME = {genre_id: name for genre_id, name in GENRES}
+GENRE_BITS = {genre_id: 1 << bit for bit, (genre_id, _) in enumerate(GENRES)}
+
+MASK_DTYPE = np.uint32
+
+
+def mask_from_ids(genre_ids: Iterable[int]) -> int:
+    """Genre mask for TMDB genre ids (unknown ids are ignored)"""
+    mask = 0
+    for genre_id in genre_ids:
+        mask |= GENRE_BITS.get(genre_id, 0)
+    return mask
+
+
+def ids_from_mask(mask: int) -> List[int]:
+    """TMDB genre ids set in a mask, in GENRES order"""
+    return [genre_id for bit, (genre_id, _) in enumerate(GENRES) if mask >> bit & 1]
+
+
+def names_from_mask(mask: int) -> List[str]:
+    return [GENRE_ID_TO_NAME[genre_id] for genre_id in ids_from_mask(mask)]
+
+
+def encode_genres(genres: pd.Series) -> pd.Series:
+    """
+    Encode '|' or ',' separated genre names into uint32 masks, one vectorized
+    pass per known genre.
+    """
+    genres = genres.fillna('').astype(str)
+    mask = np.zeros(len(genres), dtype=MASK_DTYPE)
+    for genre_id, name in GENRES:
+        pattern = rf'(?:^|[|,])\s*{re.escape(name)}\s*(?:$|[|,])'
+        present = genres.str.contains(pattern, regex=True).to_numpy()
+        mask[present] |= MASK_DTYPE(GENRE_BITS[genre_id])
+    return pd.Series(mask, index=genres.index, name='genre_mask')
+
+
+def genre_distribution(masks: pd.Series) -> pd.Series:
+    """Number of movies per genre, counted bit by bit over the mask column"""
+    values = masks.to_numpy(dtype=MASK_DTYPE)
+    counts = {name: int(np.count_nonzero(values & MASK_DTYPE(GENRE_BITS[genre_id])))
+              for genre_id, name in GENRES}
+    return pd.Series(counts, name='count').sort_values(ascending=False)
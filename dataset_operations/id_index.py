@@ -0,0 +1,19 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+def sorted_id_index(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted known TMDB ids (missing ids are -1) and the row of each, for np.searchsorted lookups"""
+    ids = np.asarray(ids)
+    rows = np.flatnonzero(ids >= 0)
+    order = np.argsort(ids[rows], kind='stable')
+    return np.asarray(ids[rows][order], dtype=np.int64), rows[order].astype(np.int64)
+
+
+def lookup_id(sorted_ids: np.ndarray, sorted_rows: np.ndarray, movie_id: int) -> Optional[int]:
+    """Row of a TMDB id by binary search, or None"""
+    movie_id = int(movie_id)
+    position = int(np.searchsorted(sorted_ids, movie_id))
+    if position < len(sorted_ids) and sorted_ids[position] == movie_id:
+        return int(sorted_rows[position])
+    return None
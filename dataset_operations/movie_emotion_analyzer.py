@@ -1,24 +1,49 @@
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
+import copy
 import json
+import os
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+from genre_bitmask import GENRE_BITS, GENRE_ID_TO_NAME, GENRE_NAME_TO_ID, ids_from_mask, mask_from_ids
+from movie_validation import validate_movies, combine_quarantine, quarantine_path_for
+
 class MovieEmotionAnalyzer:
     """
     A comprehensive movie emotion analysis system that combines genre-based, keyword-based,
     and content-based analysis to generate emotion scores for movies.
+    
+    Optional weight profiles (e.g. for A/B experiments) override any of PROFILE_KEYS
+    and are scored together in a single pass with analyze_movie_profiles: parsing
+    and text matching are shared, only weighting and normalization run per profile.
+    Overrides are merged one level down: a profile setting one weight of a mood,
+    genre or era band keeps every other weight of that entry. GENRE_COMBINATIONS
+    entries are (genre ids, bonuses) pairs and are replaced whole.
     """
     
-    def __init__(self):
+    # Mappings a weight profile may override
+    PROFILE_KEYS = ('GENRE_EMOTIONS', 'MOODS', 'CONTENT_WEIGHTS', 'ERA_WEIGHTS', 'GENRE_COMBINATIONS')
+    
+    def __init__(self, profiles: Dict[str, Dict] = None):
         # Initialize scalers and vectorizers
         self.scaler = MinMaxScaler((0, 10))
         
         # Initialize the emotion mappings and weights
         self._init_emotion_mappings()
         self._validate_mappings()
+        
+        # Resolve weight profiles and the lexicon shared by all of them
+        self.profiles = {name: self._resolve_profile(overrides)
+                         for name, overrides in (profiles or {}).items()}
+        self._profile_lexicon = self._build_lexicon(self.profiles.values())
+        self._profile_tables = {name: self._build_scoring_tables(profile)
+                                for name, profile in self.profiles.items()}
+        self._default_lexicon = self._build_lexicon([self.default_profile()])
+        self._default_tables = self._build_scoring_tables(self.default_profile())
+        self._profile_stack = self._build_profile_stack() if self.profiles else None
 
     def _init_emotion_mappings(self):
         """Initialize all emotion-related mappings and configurations"""
@@ -298,11 +323,64 @@ class MovieEmotionAnalyzer:
             }
         }
 
-    def _validate_mappings(self):
+        # Emotional themes matched in overview and tagline text
+        self.EMOTIONAL_THEMES = {
+            'sad': [
+                'death', 'loss', 'sacrifice', 'holocaust', 'tragedy', 
+                'terminal illness', 'farewell', 'heartbreak', 'grief',
+                'loneliness', 'depression', 'suffering', 'separation',
+                'mourning', 'tears', 'sorrow', 'regret'
+            ],
+            'romantic': [
+                'love', 'romance', 'relationship', 'passion', 'heart', 
+                'destiny', 'soulmate', 'kiss', 'wedding', 'marriage',
+                'affection', 'embrace', 'romantic', 'date', 'lovers',
+                'chemistry', 'attraction', 'courtship'
+            ],
+            'nostalgic': [
+                'memory', 'past', 'childhood', 'remember', 'history',
+                'classic', 'vintage', 'retro', 'tradition', 'heritage',
+                'old days', 'memories', 'throwback', 'reminisce',
+                'bygone era', 'golden age', 'timeless', 'legacy'
+            ]
+        }
+
+        # Genre combination bonuses
+        self.GENRE_COMBINATIONS = {
+            'epic_adventure': ([12, 28, 14], {'adventurous': 0.4, 'excited': 0.3}),
+            'romantic_comedy': ([35, 10749], {'happy': 0.3, 'romantic': 0.4}),  # Increased romantic
+            'romantic_drama': ([18, 10749], {'romantic': 0.5, 'sad': 0.3, 'nostalgic': 0.3}),  # New combination
+            'historical_romance': ([36, 10749], {'romantic': 0.4, 'nostalgic': 0.5}),  # New combination
+            'sci_fi_thriller': ([878, 53], {'curious': 0.3, 'excited': 0.3}),
+            'historical_drama': ([36, 18], {'thoughtful': 0.3, 'nostalgic': 0.4}),  # Increased nostalgic
+            'family_adventure': ([10751, 12], {'happy': 0.3, 'adventurous': 0.3}),
+            'war_drama': ([10752, 18], {'thoughtful': 0.3, 'sad': 0.3, 'nostalgic': 0.3}),
+            'war_action': ([10752, 28], {'excited': 0.4, 'adventurous': 0.3, 'energetic': 0.3}),
+            'mystery_thriller': ([9648, 53], {'curious': 0.3, 'excited': 0.3}),
+            'animated_family': ([16, 10751], {'happy': 0.3, 'peaceful': 0.3})
+        }
+
+        # Keyword themes and the moods they boost
+        self.KEYWORD_THEMES = {
+            'action': ['fight', 'battle', 'chase', 'explosion', 'combat'],
+            'emotion': ['love', 'hate', 'fear', 'joy', 'sorrow'],
+            'adventure': ['quest', 'journey', 'expedition', 'discovery'],
+            'drama': ['tragedy', 'conflict', 'relationship', 'struggle'],
+            'mystery': ['secret', 'conspiracy', 'investigation', 'mystery']
+        }
+        self.THEME_TO_MOOD = {
+            'action': ['excited', 'energetic'],
+            'emotion': ['sad', 'happy', 'romantic'],
+            'adventure': ['adventurous', 'curious'],
+            'drama': ['thoughtful', 'sad'],
+            'mystery': ['curious', 'thoughtful']
+        }
+
+    def _validate_mappings(self, moods: Dict = None):
         """Validate all emotion mappings and configurations"""
         # Validate MOODS structure
         required_keys = {'genres', 'keywords', 'weight'}
-        for mood, data in self.MOODS.items():
+        for mood, data in (moods or self.MOODS).items():
             if not isinstance(mood, str):
                 raise ValueError(f"Mood key must be string: {mood}")
             if not isinstance(data, dict):
@@ -316,27 +394,41 @@ class MovieEmotionAnalyzer:
         """Normalize scores to range 0-10 with enhanced distribution"""
         if not vector:
             return [0.0] * len(vector)
-            
-        # Convert to numpy array and reshape
-        arr = np.array(vector).reshape(1, -1)
+        return self.normalize_score_matrix([vector])[0]
+
+    def normalize_score_matrix(self, vectors: List[List[float]]) -> List[List[float]]:
+        """
+        Normalize several raw score vectors (e.g. one per weight profile) at once;
+        each row gets the same sigmoid normalization as normalize_scores.
+        """
+        arr = np.array(vectors, dtype=float)
         
-        # If all values are 0, return zero vector
-        if np.all(arr == 0):
-            return [0.0] * len(vector)
-            
-        # If all values are the same but not 0, add small random variations
-        if np.all(arr == arr[0][0]) and arr[0][0] != 0:
-            variations = np.random.uniform(-0.1, 0.1, arr.shape)
-            arr = arr + variations
+        # All-zero rows stay zero vectors
+        zero_rows = np.all(arr == 0, axis=1)
+        
+        # Rows whose values are all the same but not 0 get small random variations
+        constant_rows = np.all(arr == arr[:, :1], axis=1) & ~zero_rows
+        for row in np.flatnonzero(constant_rows):
+            arr[row] = arr[row] + np.random.uniform(-0.1, 0.1, (1, arr.shape[1]))[0]
             
         # Apply sigmoid normalization for better distribution
-        mean = np.mean(arr)
-        std = np.std(arr) if np.std(arr) != 0 else 1
-        sigmoid = 1 / (1 + np.exp(-(arr - mean) / std))
-        normalized = sigmoid * 10
+        mean = np.mean(arr, axis=1, keepdims=True)
+        std = np.std(arr, axis=1, keepdims=True)
+        std[std == 0] = 1
+        normalized = 1 / (1 + np.exp(-(arr - mean) / std)) * 10
+        normalized[zero_rows] = 0.0
         
         # Round to 2 decimal places
-        return [round(x, 2) for x in normalized[0].tolist()]
+        return [[round(x, 2) for x in row] for row in normalized.tolist()]
+
+    def parse_movie_id(self, movie_id) -> Optional[int]:
+        """Parse the TMDB movie id, returning None when it is missing or invalid"""
+        try:
+            if movie_id is None or pd.isna(movie_id):
+                return None
+            return int(float(movie_id))
+        except (TypeError, ValueError):
+            return None
 
     def parse_genre_ids(self, genre_data: str) -> List[int]:
         """Parse genre IDs from string format"""
@@ -344,31 +436,9 @@ class MovieEmotionAnalyzer:
             return []
             
         try:
-            # Convert genre names to IDs based on standard mapping
-            genre_mapping = {
-                'Action': 28,
-                'Adventure': 12,
-                'Animation': 16,
-                'Comedy': 35,
-                'Crime': 80,
-                'Documentary': 99,
-                'Drama': 18,
-                'Family': 10751,
-                'Fantasy': 14,
-                'History': 36,
-                'Horror': 27,
-                'Music': 10402,
-                'Mystery': 9648,
-                'Romance': 10749,
-                'Science Fiction': 878,
-                'Thriller': 53,
-                'War': 10752,
-                'Western': 37
-            }
-            
-            # Split genres and convert to IDs
+            # Split genres and convert to IDs based on standard mapping
             genres = [g.strip() for g in genre_data.split(',')]
-            genre_ids = [genre_mapping[g] for g in genres if g in genre_mapping]
+            genre_ids = [GENRE_NAME_TO_ID[g] for g in genres if g in GENRE_NAME_TO_ID]
             
             return genre_ids
                 
@@ -387,252 +457,446 @@ class MovieEmotionAnalyzer:
         keywords = [k.strip().lower() for k in keyword_data.split(',')]
         return [k for k in keywords if k]  # Remove empty strings
 
-    def score_by_genres(self, genre_ids: List[int]) -> Dict[str, float]:
-        """Calculate mood scores based on movie genres"""
-        scores = {mood: 0.0 for mood in self.MOODS.keys()}
+    def default_profile(self) -> Dict:
+        """The analyzer's own mappings as a weight profile"""
+        return {key: getattr(self, key) for key in self.PROFILE_KEYS}
+
+    def _resolve_profile(self, overrides: Dict) -> Dict:
+        """Merge profile overrides onto copies of the default mappings"""
+        profile = copy.deepcopy(self.default_profile())
+        for key, value in overrides.items():
+            if key not in self.PROFILE_KEYS:
+                raise ValueError(f"Unknown profile key: {key}")
+            if key == 'MOODS':
+                # Mood order defines the vector layout, so profiles can only reweight moods
+                for mood, data in value.items():
+                    if mood not in profile['MOODS']:
+                        raise ValueError(f"Profiles cannot add moods: {mood}")
+                    profile['MOODS'][mood] = {**profile['MOODS'][mood], **data}
+            elif key in ('GENRE_EMOTIONS', 'ERA_WEIGHTS'):
+                # Per genre / per mood weight tables: merge so unspecified weights keep their defaults
+                for name, weights in value.items():
+                    if not isinstance(weights, dict):
+                        raise ValueError(f"{key}['{name}'] must be a dictionary")
+                    profile[key][name] = {**profile[key].get(name, {}), **copy.deepcopy(weights)}
+            else:
+                profile[key].update(copy.deepcopy(value))
+        self._validate_mappings(profile['MOODS'])
+        self._validate_profile(profile)
+        return profile
+
+    def _validate_profile(self, profile: Dict):
+        """Reject moods and content weights a profile references but the analyzer does not know"""
+        moods = profile['MOODS']
+
+        def check_moods(mapping: Dict, where: str):
+            if not isinstance(mapping, dict):
+                raise ValueError(f"{where} must be a dictionary of moods")
+            unknown = [mood for mood in mapping if mood not in moods]
+            if unknown:
+                raise ValueError(f"Unknown moods in {where}: {', '.join(map(str, unknown))}")
+
+        for genre, weights in profile['GENRE_EMOTIONS'].items():
+            check_moods(weights, f"GENRE_EMOTIONS['{genre}']")
+        check_moods(profile['ERA_WEIGHTS'], 'ERA_WEIGHTS')
+        for name, combination in profile['GENRE_COMBINATIONS'].items():
+            if not isinstance(combination, (tuple, list)) or len(combination) != 2:
+                raise ValueError(f"GENRE_COMBINATIONS['{name}'] must be (genre ids, mood bonuses)")
+            check_moods(combination[1], f"GENRE_COMBINATIONS['{name}']")
+
+        unknown = [key for key in profile['CONTENT_WEIGHTS'] if key not in self.CONTENT_WEIGHTS]
+        if unknown:
+            raise ValueError(f"Unknown CONTENT_WEIGHTS keys: {', '.join(map(str, unknown))}")
+
+    def _build_lexicon(self, profiles) -> List[str]:
+        """All lowercase terms matched against overview/tagline text for the given profiles"""
+        terms = {theme.lower() for themes in self.EMOTIONAL_THEMES.values() for theme in themes}
+        for profile in profiles:
+            for data in profile['MOODS'].values():
+                terms.update(k.lower() for k in data['keywords'])
+        return sorted(terms)
+
+    def _build_keyword_index(self, moods: Dict) -> Dict[str, List[str]]:
+        """Map each lowercase keyword to the moods listing it (once per listing)"""
+        index = {}
+        for mood, data in moods.items():
+            for k in data['keywords']:
+                index.setdefault(k.lower(), []).append(mood)
+        return index
+
+    def _build_scoring_tables(self, profile: Dict) -> Dict:
+        """Lookup tables derived from a profile, built once per analyzer"""
+        combination_masks = [
+            (mask_from_ids(required_genres), bonuses)
+            for required_genres, bonuses in profile['GENRE_COMBINATIONS'].values()
+            # A combination requiring a genre outside the mask can never match
+            if all(genre in GENRE_BITS for genre in required_genres)
+        ]
+        return {
+            'keyword_index': self._build_keyword_index(profile['MOODS']),
+            'combination_masks': combination_masks,
+            'genre_scores': {}  # genre mask -> genre scores, filled lazily
+        }
+
+    def _build_profile_stack(self) -> Dict:
+        """
+        Per-profile weights stacked into (profiles, moods) arrays so every profile
+        is weighted with a few numpy operations per movie (see _stacked_raw_scores).
+        """
+        moods = list(self.MOODS.keys())
+        mood_index = {mood: i for i, mood in enumerate(moods)}
+        profiles = list(self.profiles.values())
+        term_index = {term: i for i, term in enumerate(self._profile_lexicon)}
         
-        if not genre_ids:
-            return scores
+        # Keyword listings per lexicon term, profile and mood
+        keyword_counts = np.zeros((len(term_index), len(profiles), len(moods)))
+        for p, name in enumerate(self.profiles):
+            for term, term_moods in self._profile_tables[name]['keyword_index'].items():
+                for mood in term_moods:
+                    keyword_counts[term_index[term], p, mood_index[mood]] += 1
         
-        # Convert genre IDs back to names for emotion mapping
-        genre_id_to_name = {
-            28: 'Action',
-            12: 'Adventure',
-            16: 'Animation',
-            35: 'Comedy',
-            80: 'Crime',
-            99: 'Documentary',
-            18: 'Drama',
-            10751: 'Family',
-            14: 'Fantasy',
-            36: 'History',
-            27: 'Horror',
-            10402: 'Music',
-            9648: 'Mystery',
-            10749: 'Romance',
-            878: 'Science Fiction',
-            53: 'Thriller',
-            10752: 'War',
-            37: 'Western'
+        def column(key: str) -> np.ndarray:
+            return np.array([[profile['CONTENT_WEIGHTS'][key]] for profile in profiles])
+        
+        return {
+            'moods': moods,
+            'mood_index': mood_index,
+            'term_index': term_index,
+            'keyword_counts': keyword_counts,
+            'mood_weights': np.array([[profile['MOODS'][mood]['weight'] for mood in moods]
+                                      for profile in profiles]),
+            'keyword_weight': column('keyword'),
+            'atmosphere_weight': column('atmosphere'),
+            'era_scores': {},  # release year -> (profiles, moods) era scores, filled lazily
+            'genre_scores': {}  # genre mask -> (base scores, combination bonus steps), filled lazily
         }
+
+    def _stack_vector(self, scores: Dict[str, float]) -> np.ndarray:
+        return np.array([scores.get(mood, 0) for mood in self._profile_stack['moods']])
+
+    def _stacked_era_scores(self, release_year: int) -> np.ndarray:
+        stack = self._profile_stack
+        if release_year not in stack['era_scores']:
+            stack['era_scores'][release_year] = np.array([
+                self._stack_vector(self._era_scores(release_year, profile))
+                for profile in self.profiles.values()
+            ])
+        return stack['era_scores'][release_year]
+
+    def _stacked_genre_scores(self, genre_mask: int) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Base genre scores and, in application order, one array per matching genre combination"""
+        stack = self._profile_stack
+        if genre_mask not in stack['genre_scores']:
+            genre_ids = ids_from_mask(genre_mask)
+            base = np.array([self._stack_vector(self._score_genres(genre_ids, profile))
+                             for profile in self.profiles.values()])
+            steps = []
+            for p, name in enumerate(self.profiles):
+                matched = [bonuses for combo_mask, bonuses in self._profile_tables[name]['combination_masks']
+                           if genre_mask & combo_mask == combo_mask]
+                for j, bonuses in enumerate(matched):
+                    if j == len(steps):
+                        steps.append(np.zeros_like(base))
+                    for mood, bonus in bonuses.items():
+                        steps[j][p, stack['mood_index'][mood]] = bonus
+            stack['genre_scores'][genre_mask] = (base, steps)
+        return stack['genre_scores'][genre_mask]
+
+    def _stacked_raw_scores(self, features: Dict) -> np.ndarray:
+        """
+        raw_scores for every configured profile at once, as a (profiles, moods)
+        array. Contributions are added in the same order as raw_scores, so each
+        row equals that profile's raw_scores exactly.
+        """
+        stack = self._profile_stack
+        all_scores = np.zeros(stack['mood_weights'].shape)
+        
+        # 1. Era-based scoring
+        if features['release_year'] is not None:
+            all_scores = all_scores + self._stacked_era_scores(features['release_year'])
+        
+        # 2. Overview and tagline keyword matches
+        for matches_key, themes_key, factor in (('overview_matches', 'overview_theme_counts', 1.2),
+                                                ('tagline_matches', 'tagline_theme_counts', 0.8)):
+            matches = features[matches_key]
+            if matches is None:
+                continue
+            rows = [stack['term_index'][term] for term in matches]
+            counts = stack['keyword_counts'][rows].sum(axis=0) if rows else np.zeros_like(all_scores)
+            weighted = counts * stack['mood_weights']
+            scores = weighted * stack['keyword_weight'] + weighted * stack['atmosphere_weight']
+            all_scores = all_scores + (scores * factor + self._stack_vector(features[themes_key]))
+        
+        # 3. Genre combinations, then base genre scores
+        base, steps = self._stacked_genre_scores(features['genre_mask'])
+        for step in steps:
+            all_scores = all_scores + step
+        all_scores = all_scores + base * 1.3
+        
+        # 4. Keyword theme bonuses
+        for mood, presence in features['keyword_theme_bonuses']:
+            all_scores[:, stack['mood_index'][mood]] += presence
+        
+        # 5-7. Runtime, rating and popularity
+        for key, factor in (('runtime_scores', 0.4), ('rating_scores', 0.5), ('popularity_scores', 0.3)):
+            if features[key]:
+                all_scores = all_scores + self._stack_vector(features[key]) * factor
+        
+        return all_scores
+
+    def _match_lexicon(self, text: str, lexicon: List[str]) -> set:
+        """Find the lexicon terms that occur in the text (substring match)"""
+        text = text.lower().strip()
+        return {term for term in lexicon if term in text}
+
+    def _score_genres(self, genre_ids: List[int], profile: Dict) -> Dict[str, float]:
+        """Calculate mood scores based on movie genres for a weight profile"""
+        scores = {mood: 0.0 for mood in profile['MOODS'].keys()}
+        
+        if not genre_ids:
+            return scores
         
         for genre_id in genre_ids:
-            if genre_id not in genre_id_to_name:
+            if genre_id not in GENRE_ID_TO_NAME:
                 continue
                 
-            genre_name = genre_id_to_name[genre_id]
+            genre_name = GENRE_ID_TO_NAME[genre_id]
             
-            if genre_name in self.GENRE_EMOTIONS:
-                for mood, weight in self.GENRE_EMOTIONS[genre_name].items():
-                    scores[mood] += weight * self.CONTENT_WEIGHTS['genre']
+            if genre_name in profile['GENRE_EMOTIONS']:
+                for mood, weight in profile['GENRE_EMOTIONS'][genre_name].items():
+                    scores[mood] += weight * profile['CONTENT_WEIGHTS']['genre']
         
         return scores
 
-    def score_by_keywords_and_overview(self, text: str) -> Dict[str, float]:
-        """Calculate mood scores based on movie keywords and overview"""
-        scores = {mood: 0.0 for mood in self.MOODS.keys()}
+    def _score_keyword_matches(self, matches: set, profile: Dict,
+                               keyword_index: Dict[str, List[str]]) -> Dict[str, float]:
+        """Calculate mood scores from lexicon matches for a weight profile"""
+        scores = {mood: 0.0 for mood in profile['MOODS'].keys()}
         
-        if not text:
-            return scores
-            
-        text = text.lower().strip()
+        # Count matched keywords per mood
+        match_counts = {}
+        for term in matches:
+            for mood in keyword_index.get(term, ()):
+                match_counts[mood] = match_counts.get(mood, 0) + 1
         
-        for mood, data in self.MOODS.items():
+        for mood, data in profile['MOODS'].items():
             # Check keywords in text
-            keyword_matches = sum(1 for k in data['keywords'] 
-                                if k.lower() in text)
+            keyword_matches = match_counts.get(mood, 0)
             if keyword_matches > 0:
-                scores[mood] += keyword_matches * data['weight'] * self.CONTENT_WEIGHTS['keyword']
+                scores[mood] += keyword_matches * data['weight'] * profile['CONTENT_WEIGHTS']['keyword']
             
             # Check atmosphere words in text
-            atmosphere_matches = sum(1 for a in data['keywords'] 
-                                   if a.lower() in text)
+            atmosphere_matches = keyword_matches
             if atmosphere_matches > 0:
-                scores[mood] += atmosphere_matches * data['weight'] * self.CONTENT_WEIGHTS['atmosphere']
+                scores[mood] += atmosphere_matches * data['weight'] * profile['CONTENT_WEIGHTS']['atmosphere']
         
         return scores
 
-    def analyze_movie(self, movie: Dict) -> Dict:
-        try:
-            # Initialize scores
-            all_scores = {mood: 0.0 for mood in self.MOODS.keys()}
-            
-            # Extract basic movie data
-            title = str(movie.get('title', 'Unknown Movie'))
-            
-            # Get release year and apply era-based scoring
+    def _theme_counts(self, matches: set, factor: float) -> Dict[str, float]:
+        """Weighted emotional theme occurrences from lexicon matches"""
+        return {
+            emotion: sum(1 for theme in themes if theme.lower() in matches) * factor
+            for emotion, themes in self.EMOTIONAL_THEMES.items()
+        }
+
+    def score_by_genres(self, genre_ids: List[int]) -> Dict[str, float]:
+        """Calculate mood scores based on movie genres"""
+        return self._score_genres(genre_ids, self.default_profile())
+
+    def score_by_keywords_and_overview(self, text: str) -> Dict[str, float]:
+        """Calculate mood scores based on movie keywords and overview"""
+        profile = self.default_profile()
+        if not text:
+            return {mood: 0.0 for mood in profile['MOODS'].keys()}
+        
+        matches = self._match_lexicon(text, self._build_lexicon([profile]))
+        return self._score_keyword_matches(matches, profile, self._build_keyword_index(profile['MOODS']))
+
+    def extract_features(self, movie: Dict, lexicon: List[str], text: bool = True) -> Dict:
+        """
+        Parse a movie and run the profile-independent analysis (text matching, structured scores).
+        With text=False the overview, tagline and keyword analysis is skipped and only
+        structured fields (genres, era, runtime, rating, popularity) contribute.
+        """
+        # Extract basic movie data
+        features = {
+            'id': self.parse_movie_id(movie.get('id')),
+            'title': str(movie.get('title', 'Unknown Movie'))
+        }
+        
+        # Get release year (typed by validate_movies, else parsed from the date)
+        release_year = movie.get('release_year')
+        if release_year is None or pd.isna(release_year):
             release_year = None
             if release_date := movie.get('release_date', ''):
                 try:
-                    release_year = int(release_date[:4])
-                    current_year = datetime.now().year
-                    
-                    # Apply era-based emotion weights
-                    for emotion, era_ranges in self.ERA_WEIGHTS.items():
-                        for (start, end), weight in era_ranges.items():
-                            if start <= release_year <= end:
-                                all_scores[emotion] += weight * self.CONTENT_WEIGHTS['year']
-                    
-                    # Additional nostalgic boost based on age
-                    age = current_year - release_year
-                    if age > 0:
-                        nostalgic_boost = min(age / 100, 1.0) * 0.5  # Max 50% boost for 100+ year old films
-                        all_scores['nostalgic'] += nostalgic_boost * self.CONTENT_WEIGHTS['year']
-                except:
+                    release_year = int(str(release_date)[:4])
+                except ValueError:
                     pass
+        features['release_year'] = int(release_year) if release_year is not None else None
 
-            # Update emotional themes
-            emotional_themes = {
-                'sad': [
-                    'death', 'loss', 'sacrifice', 'holocaust', 'tragedy', 
-                    'terminal illness', 'farewell', 'heartbreak', 'grief',
-                    'loneliness', 'depression', 'suffering', 'separation',
-                    'mourning', 'tears', 'sorrow', 'regret'
-                ],
-                'romantic': [
-                    'love', 'romance', 'relationship', 'passion', 'heart', 
-                    'destiny', 'soulmate', 'kiss', 'wedding', 'marriage',
-                    'affection', 'embrace', 'romantic', 'date', 'lovers',
-                    'chemistry', 'attraction', 'courtship'
-                ],
-                'nostalgic': [
-                    'memory', 'past', 'childhood', 'remember', 'history',
-                    'classic', 'vintage', 'retro', 'tradition', 'heritage',
-                    'old days', 'memories', 'throwback', 'reminisce',
-                    'bygone era', 'golden age', 'timeless', 'legacy'
-                ]
-            }
+        # Match Overview and Tagline text against the shared lexicon
+        overview = str(movie.get('overview', '')) if text else ''
+        features['overview_matches'] = self._match_lexicon(overview, lexicon) if overview else None
+        if features['overview_matches'] is not None:
+            features['overview_theme_counts'] = self._theme_counts(features['overview_matches'], 0.35)  # Increased from 0.3
+        tagline = str(movie.get('tagline', '')) if text else ''
+        features['tagline_matches'] = self._match_lexicon(tagline, lexicon) if tagline else None
+        if features['tagline_matches'] is not None:
+            features['tagline_theme_counts'] = self._theme_counts(features['tagline_matches'], 0.25)  # Increased from 0.2
 
-            # Process Overview Text with enhanced emotional analysis
-            overview = str(movie.get('overview', ''))
-            if overview:
-                # Count theme occurrences for each emotion
-                theme_counts = {}
-                for emotion, themes in emotional_themes.items():
-                    count = sum(1 for theme in themes if theme.lower() in overview.lower())
-                    theme_counts[emotion] = count * 0.35  # Increased from 0.3
-                
-                overview_scores = self.score_by_keywords_and_overview(overview)
-                for mood, score in overview_scores.items():
-                    theme_bonus = theme_counts.get(mood, 0)
-                    all_scores[mood] += (score * 1.2) + theme_bonus
-
-            # Process Tagline
-            tagline = str(movie.get('tagline', ''))
-            if tagline:
-                tagline_theme_counts = {}
-                for emotion, themes in emotional_themes.items():
-                    count = sum(1 for theme in themes if theme.lower() in tagline.lower())
-                    tagline_theme_counts[emotion] = count * 0.25  # Increased from 0.2
-                
-                tagline_scores = self.score_by_keywords_and_overview(tagline)
-                for mood, score in tagline_scores.items():
-                    theme_bonus = tagline_theme_counts.get(mood, 0)
-                    all_scores[mood] += (score * 0.8) + theme_bonus
-
-            # Update genre combinations
-            genre_combinations = {
-                'epic_adventure': ([12, 28, 14], {'adventurous': 0.4, 'excited': 0.3}),
-                'romantic_comedy': ([35, 10749], {'happy': 0.3, 'romantic': 0.4}),  # Increased romantic
-                'romantic_drama': ([18, 10749], {'romantic': 0.5, 'sad': 0.3, 'nostalgic': 0.3}),  # New combination
-                'historical_romance': ([36, 10749], {'romantic': 0.4, 'nostalgic': 0.5}),  # New combination
-                'sci_fi_thriller': ([878, 53], {'curious': 0.3, 'excited': 0.3}),
-                'historical_drama': ([36, 18], {'thoughtful': 0.3, 'nostalgic': 0.4}),  # Increased nostalgic
-                'family_adventure': ([10751, 12], {'happy': 0.3, 'adventurous': 0.3}),
-                'war_drama': ([10752, 18], {'thoughtful': 0.3, 'sad': 0.3, 'nostalgic': 0.3}),
-                'war_action': ([10752, 28], {'excited': 0.4, 'adventurous': 0.3, 'energetic': 0.3}),
-                'mystery_thriller': ([9648, 53], {'curious': 0.3, 'excited': 0.3}),
-                'animated_family': ([16, 10751], {'happy': 0.3, 'peaceful': 0.3})
-            }
+        # Genres as a bitmask (persisted by validate_movies, else parsed here)
+        genre_mask = movie.get('genre_mask')
+        if genre_mask is None or pd.isna(genre_mask):
+            genre_mask = mask_from_ids(self.parse_genre_ids(movie.get('genres', '')))
+        features['genre_mask'] = int(genre_mask)
 
-            # 3. Process Genres with enhanced combinations
-            genre_data = movie.get('genres', '')
-            genre_ids = self.parse_genre_ids(genre_data)
-            genre_scores = self.score_by_genres(genre_ids)
-            
-            # Apply combination bonuses
-            for combo_name, (required_genres, bonuses) in genre_combinations.items():
-                if all(genre in genre_ids for genre in required_genres):
-                    for mood, bonus in bonuses.items():
-                        all_scores[mood] += bonus
-            
-            # Apply base genre scores
-            for mood, score in genre_scores.items():
-                all_scores[mood] += score * 1.3
+        # Process Keywords grouped by themes
+        keywords = self.parse_keywords(movie.get('keywords', '')) if text else []
+        theme_bonuses = []
+        for theme, theme_keywords in self.KEYWORD_THEMES.items():
+            matches = sum(1 for k in keywords if any(tk.lower() in k.lower() for tk in theme_keywords))
+            presence = matches * 0.2
+            if presence > 0:
+                for mood in self.THEME_TO_MOOD.get(theme, []):
+                    theme_bonuses.append((mood, presence))
+        features['keyword_theme_bonuses'] = theme_bonuses
 
-            # 4. Process Keywords with enhanced weighting
-            keyword_data = movie.get('keywords', '')
-            keywords = self.parse_keywords(keyword_data)
-            
-            # Group keywords by themes
-            keyword_themes = {
-                'action': ['fight', 'battle', 'chase', 'explosion', 'combat'],
-                'emotion': ['love', 'hate', 'fear', 'joy', 'sorrow'],
-                'adventure': ['quest', 'journey', 'expedition', 'discovery'],
-                'drama': ['tragedy', 'conflict', 'relationship', 'struggle'],
-                'mystery': ['secret', 'conspiracy', 'investigation', 'mystery']
-            }
-            
-            # Calculate theme presence
-            theme_presence = {theme: 0 for theme in keyword_themes}
-            for theme, theme_keywords in keyword_themes.items():
-                matches = sum(1 for k in keywords if any(tk.lower() in k.lower() for tk in theme_keywords))
-                theme_presence[theme] = matches * 0.2
-            
-            # Apply theme bonuses
-            theme_to_mood = {
-                'action': ['excited', 'energetic'],
-                'emotion': ['sad', 'happy', 'romantic'],
-                'adventure': ['adventurous', 'curious'],
-                'drama': ['thoughtful', 'sad'],
-                'mystery': ['curious', 'thoughtful']
-            }
-            
-            for theme, presence in theme_presence.items():
-                if presence > 0:
-                    for mood in theme_to_mood.get(theme, []):
-                        all_scores[mood] += presence
-
-            # 5. Process Runtime with more granular analysis
-            runtime = int(movie.get('runtime', 0))
-            if runtime > 0:
-                runtime_scores = self.score_by_runtime(runtime)
-                for mood, score in runtime_scores.items():
-                    all_scores[mood] += score * 0.4
-
-            # 6. Process Vote Average and Count with enhanced weighting
-            vote_average = float(movie.get('vote_average', 0))
-            vote_count = int(movie.get('vote_count', 0))
-            if vote_average > 0 and vote_count > 0:
-                rating_scores = self.score_by_rating(vote_average, vote_count)
-                for mood, score in rating_scores.items():
-                    all_scores[mood] += score * 0.5
-
-            # 7. Process Popularity with mood correlations
-            popularity = float(movie.get('popularity', 0))
-            if popularity > 0:
-                popularity_scores = self.score_by_popularity(popularity)
-                for mood, score in popularity_scores.items():
-                    all_scores[mood] += score * 0.3
-
-            # Convert scores to vector
-            emotion_vector = [all_scores[mood] for mood in self.MOODS.keys()]
-            
-            # Normalize vector with enhanced strategy
-            normalized_vector = self.normalize_scores(emotion_vector)
-            
-            return {
-                'title': title,
-                'release_year': release_year,
-                'emotion_vector': normalized_vector
-            }
-            
-        except Exception as e:
-            return {
-                'title': str(movie.get('title', 'Unknown Movie')),
-                'release_year': None,
-                'emotion_vector': [0.0] * len(self.MOODS)
+        # Process Runtime with more granular analysis
+        runtime = int(movie.get('runtime', 0))
+        features['runtime_scores'] = self.score_by_runtime(runtime) if runtime > 0 else {}
+
+        # Process Vote Average and Count
+        vote_average = float(movie.get('vote_average', 0))
+        vote_count = int(movie.get('vote_count', 0))
+        features['rating_scores'] = (self.score_by_rating(vote_average, vote_count)
+                                     if vote_average > 0 and vote_count > 0 else {})
+
+        # Process Popularity
+        popularity = float(movie.get('popularity', 0))
+        features['popularity_scores'] = self.score_by_popularity(popularity) if popularity > 0 else {}
+
+        return features
+
+    def score_features(self, features: Dict, profile: Dict, tables: Dict = None) -> List[float]:
+        """Apply a weight profile to extracted features and return the normalized emotion vector"""
+        return self.normalize_scores(self.raw_scores(features, profile, tables))
+
+    def _era_scores(self, release_year: int, profile: Dict) -> Dict[str, float]:
+        """Era-based mood scores for a release year under a weight profile"""
+        scores = {mood: 0.0 for mood in profile['MOODS'].keys()}
+        year_weight = profile['CONTENT_WEIGHTS']['year']
+        
+        # Apply era-based emotion weights
+        for emotion, era_ranges in profile['ERA_WEIGHTS'].items():
+            for (start, end), weight in era_ranges.items():
+                if start <= release_year <= end:
+                    scores[emotion] += weight * year_weight
+        
+        # Additional nostalgic boost based on age
+        age = datetime.now().year - release_year
+        if age > 0:
+            nostalgic_boost = min(age / 100, 1.0) * 0.5  # Max 50% boost for 100+ year old films
+            scores['nostalgic'] += nostalgic_boost * year_weight
+        
+        return scores
+
+    def raw_scores(self, features: Dict, profile: Dict, tables: Dict = None) -> List[float]:
+        """Apply a weight profile to extracted features and return the unnormalized mood scores"""
+        if tables is None:
+            tables = self._build_scoring_tables(profile)
+        keyword_index = tables['keyword_index']
+        
+        # Initialize scores
+        all_scores = {mood: 0.0 for mood in profile['MOODS'].keys()}
+        content_weights = profile['CONTENT_WEIGHTS']
+        
+        # 1. Apply era-based scoring
+        release_year = features['release_year']
+        if release_year is not None:
+            for mood, score in self._era_scores(release_year, profile).items():
+                all_scores[mood] += score
+
+        # 2. Process Overview Text with enhanced emotional analysis
+        if (matches := features['overview_matches']) is not None:
+            theme_counts = features['overview_theme_counts']
+            overview_scores = self._score_keyword_matches(matches, profile, keyword_index)
+            for mood, score in overview_scores.items():
+                theme_bonus = theme_counts.get(mood, 0)
+                all_scores[mood] += (score * 1.2) + theme_bonus
+
+        # Process Tagline
+        if (matches := features['tagline_matches']) is not None:
+            tagline_theme_counts = features['tagline_theme_counts']
+            tagline_scores = self._score_keyword_matches(matches, profile, keyword_index)
+            for mood, score in tagline_scores.items():
+                theme_bonus = tagline_theme_counts.get(mood, 0)
+                all_scores[mood] += (score * 0.8) + theme_bonus
+
+        # 3. Process Genres with enhanced combinations
+        genre_mask = features['genre_mask']
+        genre_scores = tables['genre_scores'].get(genre_mask)
+        if genre_scores is None:
+            genre_scores = self._score_genres(ids_from_mask(genre_mask), profile)
+            tables['genre_scores'][genre_mask] = genre_scores
+        
+        # Apply combination bonuses (subset test on the genre mask)
+        for combo_mask, bonuses in tables['combination_masks']:
+            if genre_mask & combo_mask == combo_mask:
+                for mood, bonus in bonuses.items():
+                    all_scores[mood] += bonus
+        
+        # Apply base genre scores
+        for mood, score in genre_scores.items():
+            all_scores[mood] += score * 1.3
+
+        # 4. Apply keyword theme bonuses
+        for mood, presence in features['keyword_theme_bonuses']:
+            all_scores[mood] += presence
+
+        # 5. Runtime
+        for mood, score in features['runtime_scores'].items():
+            all_scores[mood] += score * 0.4
+
+        # 6. Vote Average and Count
+        for mood, score in features['rating_scores'].items():
+            all_scores[mood] += score * 0.5
+
+        # 7. Popularity
+        for mood, score in features['popularity_scores'].items():
+            all_scores[mood] += score * 0.3
+
+        # Convert scores to vector
+        return [all_scores[mood] for mood in profile['MOODS'].keys()]
+
+    def analyze_movie(self, movie: Dict, text: bool = True) -> Dict:
+        """Score a movie; errors propagate so a bad row never becomes a zero vector"""
+        profile = self.default_profile()
+        features = self.extract_features(movie, self._default_lexicon, text)
+        return {
+            'id': features['id'],
+            'title': features['title'],
+            'release_year': features['release_year'],
+            'emotion_vector': self.score_features(features, profile, self._default_tables)
+        }
+
+    def analyze_movie_profiles(self, movie: Dict) -> Dict[str, Dict]:
+        """Analyze a movie once and score it under every configured weight profile"""
+        if not self.profiles:
+            raise ValueError("No weight profiles configured")
+        
+        features = self.extract_features(movie, self._profile_lexicon)
+        # Weight and normalize every profile's scores in one vectorized pass
+        vectors = self.normalize_score_matrix(self._stacked_raw_scores(features))
+        return {
+            name: {
+                'id': features['id'],
+                'title': features['title'],
+                'release_year': features['release_year'],
+                'emotion_vector': vector
             }
+            for name, vector in zip(self.profiles, vectors)
+        }
 
     def score_by_runtime(self, runtime: int) -> Dict[str, float]:
         """Calculate mood scores based on movie runtime"""
@@ -749,36 +1013,148 @@ class MovieEmotionAnalyzer:
         
         return results
 
-def process_dataset(csv_path: str, output_path: str):
-    """Process movies dataset and save emotion vectors"""
+def scoring_failure(movie: Dict, error: Exception) -> Dict:
+    """Quarantine record for a movie the analyzer failed to score"""
+    return {**movie, 'quarantine_reason': f'scoring failed: {type(error).__name__}: {error}'}
+
+def _failure_frame(failures: List[Dict], columns) -> pd.DataFrame:
+    return pd.DataFrame(failures, columns=[*columns, 'quarantine_reason'])
+
+def analyze_dataframe(df: pd.DataFrame, analyzer: MovieEmotionAnalyzer = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run the analyzer over a movies DataFrame.
+    
+    Returns (emotion vector frame, failed rows with a 'quarantine_reason') so rows
+    that fail scoring are quarantined instead of becoming zero vectors.
+    """
+    if analyzer is None:
+        analyzer = MovieEmotionAnalyzer()
+
+    total_movies = len(df)
+    results = []
+    failures = []
+    for idx, movie in enumerate(df.to_dict('records')):
+        try:
+            result = analyzer.analyze_movie(movie)
+        except Exception as e:
+            failures.append(scoring_failure(movie, e))
+            continue
+        # Round emotion vector values to 2 decimal places
+        result['emotion_vector'] = [round(x, 2) for x in result['emotion_vector']]
+        results.append(result)
+        
+        # Show progress every 10000 movies
+        if (idx + 1) % 10000 == 0:
+            print(f'Processed {idx + 1}/{total_movies} movies ({((idx + 1)/total_movies*100):.1f}%)')
+    
+    return _vector_frame(results), _failure_frame(failures, df.columns)
+
+def analyze_dataframe_profiles(df: pd.DataFrame,
+                               analyzer: MovieEmotionAnalyzer) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Run every weight profile of the analyzer over a movies DataFrame in a single pass.
+    
+    Returns (emotion vector frame per profile, failed rows); a movie that fails
+    under any profile is left out of every profile's output.
+    """
+    total_movies = len(df)
+    results = {name: [] for name in analyzer.profiles}
+    failures = []
+    for idx, movie in enumerate(df.to_dict('records')):
+        try:
+            movie_results = analyzer.analyze_movie_profiles(movie)
+        except Exception as e:
+            failures.append(scoring_failure(movie, e))
+            continue
+        # Emotion vectors come back rounded to 2 decimal places by normalize_score_matrix
+        for name, result in movie_results.items():
+            results[name].append(result)
+        
+        # Show progress every 10000 movies
+        if (idx + 1) % 10000 == 0:
+            print(f'Processed {idx + 1}/{total_movies} movies ({((idx + 1)/total_movies*100):.1f}%)')
+    
+    return ({name: _vector_frame(profile_results) for name, profile_results in results.items()},
+            _failure_frame(failures, df.columns))
+
+def _vector_frame(results: List[Dict]) -> pd.DataFrame:
+    # Create output DataFrame (id, title and release_year are the join keys)
+    output_df = pd.DataFrame(results, columns=['id', 'title', 'release_year', 'emotion_vector'])
+    output_df['id'] = output_df['id'].astype('Int64')
+    return output_df
+
+def process_dataset(csv_path: str, output_path: str, shards: List = None, quarantine_path: str = None):
+    """
+    Process movies dataset and save emotion vectors.
+    
+    Input rows are validated and coerced first (see movie_validation); invalid rows,
+    and rows the analyzer fails to score, are written with their reasons to
+    quarantine_path (default: next to the output) instead of being scored.
+    
+    If csv_path is a directory of input shards (CSV or Parquet), output_path is
+    treated as an output directory and each shard is processed independently
+    (optionally only the given subset of shards), writing its own quarantine file
+    next to its output; quarantine_path is then rejected. See shard_processing.
+    """
+    if os.path.isdir(csv_path):
+        if quarantine_path is not None:
+            raise ValueError("quarantine_path is not supported for a shard directory; "
+                             "each shard writes its own quarantine file")
+        from shard_processing import process_shard_directory
+        process_shard_directory(csv_path, output_path, shards)
+        return
+
     try:
         # Read dataset
         df = pd.read_csv(csv_path)
-        total_movies = len(df)
-        print(f'Processing {total_movies} movies...')
-        
-        # Initialize analyzer
-        analyzer = MovieEmotionAnalyzer()
+        clean_df, quarantine_df = validate_movies(df)
+        print(f'Processing {len(clean_df)} movies ({len(quarantine_df)} quarantined)...')
         
-        # Process each movie
-        results = []
-        for idx, movie in df.iterrows():
-            result = analyzer.analyze_movie(movie.to_dict())
-            # Round emotion vector values to 2 decimal places
-            result['emotion_vector'] = [round(x, 2) for x in result['emotion_vector']]
-            results.append(result)
-            
-            # Show progress every 10000 movies
-            if (idx + 1) % 10000 == 0:
-                print(f'Processed {idx + 1}/{total_movies} movies ({((idx + 1)/total_movies*100):.1f}%)')
-        
-        # Create output DataFrame
-        output_df = pd.DataFrame(results)
+        output_df, failed_df = analyze_dataframe(clean_df)
+        quarantine_df = combine_quarantine(quarantine_df, failed_df)
         
         # Save results with float format
         output_df.to_csv(output_path, index=False, encoding='utf-8', float_format='%.2f')
         print(f'Emotion vectors successfully generated and saved to {output_path}')
         
+        if len(quarantine_df):
+            quarantine_path = quarantine_path or quarantine_path_for(output_path)
+            quarantine_df.to_csv(quarantine_path, index=False, encoding='utf-8')
+            print(f'Quarantined rows saved to {quarantine_path}')
+        
+    except Exception as e:
+        print(f"Error processing dataset: {str(e)}")
+
+def process_dataset_profiles(csv_path: str, output_paths: Dict[str, str], profiles: Dict[str, Dict],
+                             quarantine_path: str = None):
+    """
+    Process movies dataset once and save one emotion vector file per weight profile.
+    
+    profiles maps a profile name to overrides of MovieEmotionAnalyzer.PROFILE_KEYS
+    (an empty dict scores with the default mappings); output_paths maps the same
+    names to output files.
+    """
+    if set(output_paths) != set(profiles):
+        raise ValueError("output_paths and profiles must have the same profile names")
+
+    try:
+        # Read dataset
+        df = pd.read_csv(csv_path)
+        clean_df, quarantine_df = validate_movies(df)
+        print(f'Processing {len(clean_df)} movies with {len(profiles)} profiles ({len(quarantine_df)} quarantined)...')
+        
+        analyzer = MovieEmotionAnalyzer(profiles)
+        profile_outputs, failed_df = analyze_dataframe_profiles(clean_df, analyzer)
+        quarantine_df = combine_quarantine(quarantine_df, failed_df)
+        for name, output_df in profile_outputs.items():
+            output_df.to_csv(output_paths[name], index=False, encoding='utf-8', float_format='%.2f')
+            print(f'Emotion vectors for profile "{name}" saved to {output_paths[name]}')
+        
+        if len(quarantine_df):
+            quarantine_path = quarantine_path or quarantine_path_for(next(iter(output_paths.values())))
+            quarantine_df.to_csv(quarantine_path, index=False, encoding='utf-8')
+            print(f'Quarantined rows saved to {quarantine_path}')
+        
     except Exception as e:
         print(f"Error processing dataset: {str(e)}")
 
@@ -0,0 +1,103 @@
+import pandas as pd
+import os
+from datetime import datetime
+from typing import Tuple
+
+from genre_bitmask import encode_genres
+
+NUMERIC_COLUMNS = ['runtime', 'vote_average', 'vote_count', 'popularity']
+TEXT_COLUMNS = ['title', 'overview', 'tagline']
+MIN_YEAR = 1870
+MAX_RATING = 10.0
+
+
+def _normalize_list_column(series: pd.Series, lowercase: bool = False) -> pd.Series:
+    """Normalize '|' or ',' separated lists into a single ', ' separated string"""
+    series = series.fillna('').astype(str).str.replace(r'["\']', '', regex=True)
+    if lowercase:
+        series = series.str.lower()
+    return (
+        series.str.split(r'\s*[|,]\s*', regex=True)
+        .map(lambda items: ', '.join(item.strip() for item in items if item.strip()))
+    )
+
+
+def validate_movies(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Coerce and check a raw movies frame with column operations.
+
+    Returns (clean_df, quarantine_df). clean_df has typed columns: numeric fields
+    as floats (missing -> 0), an Int64 release_year from the leading year digits
+    of release_date (kept as the stripped date string, '' when it has no valid
+    year), text/genre/keyword columns as clean strings, and a uint32 genre_mask
+    (see genre_bitmask).
+    quarantine_df holds the original invalid rows with a 'quarantine_reason'.
+    """
+    df = df.reset_index(drop=True)
+    clean = df.copy()
+    reasons = pd.DataFrame(index=df.index)
+
+    # Movie id: optional column, but when present it must be a unique integer
+    if 'id' in df.columns:
+        ids = pd.to_numeric(df['id'], errors='coerce')
+        reasons['invalid id'] = ids.isna() | (ids % 1 != 0)
+        reasons['duplicate id'] = ids.notna() & ids.duplicated(keep='first')
+        clean['id'] = ids.where(~reasons['invalid id']).astype('Int64')
+
+    # Numeric fields: missing means "unknown" (0), unparseable or negative is invalid
+    for column in NUMERIC_COLUMNS:
+        if column not in df.columns:
+            clean[column] = 0.0
+            continue
+        raw = df[column]
+        values = pd.to_numeric(raw, errors='coerce')
+        reasons[f'invalid {column}'] = (values.isna() & raw.notna()) | (values < 0)
+        clean[column] = values.fillna(0.0).clip(lower=0.0)
+    if 'vote_average' in df.columns:
+        reasons['invalid vote_average'] |= clean['vote_average'] > MAX_RATING
+
+    # Release date -> year (same leading-4-digit rule the analyzer used)
+    if 'release_date' in df.columns:
+        dates = df['release_date'].fillna('').astype(str).str.strip()
+        years = pd.to_numeric(dates.str.extract(r'^(\d{4})', expand=False), errors='coerce')
+        out_of_range = (years < MIN_YEAR) | (years > datetime.now().year + 5)
+        reasons['invalid release_date'] = ((dates != '') & years.isna()) | out_of_range
+        clean['release_year'] = years.where(~out_of_range).astype('Int64')
+        clean['release_date'] = dates.where(clean['release_year'].notna(), '')
+    else:
+        clean['release_year'] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+        clean['release_date'] = ''
+
+    # Text fields: NaN becomes '' rather than the string 'nan'
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            clean[column] = df[column].fillna('').astype(str).str.strip()
+        else:
+            clean[column] = ''
+    reasons['missing title'] = clean['title'] == ''
+
+    clean['genres'] = _normalize_list_column(df['genres']) if 'genres' in df.columns else ''
+    clean['genre_mask'] = encode_genres(clean['genres'])
+    clean['keywords'] = _normalize_list_column(df['keywords'], lowercase=True) if 'keywords' in df.columns else ''
+
+    invalid = reasons.any(axis=1)
+    quarantine = df[invalid].copy()
+    quarantine['quarantine_reason'] = reasons[invalid].apply(
+        lambda row: '; '.join(reason for reason, flagged in row.items() if flagged), axis=1
+    ) if invalid.any() else pd.Series(dtype=str)
+
+    return clean[~invalid].reset_index(drop=True), quarantine
+
+
+def combine_quarantine(*frames: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate quarantine frames from validation and scoring, skipping empty ones"""
+    frames = [frame for frame in frames if frame is not None and len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=['quarantine_reason'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def quarantine_path_for(output_path: str) -> str:
+    """Default quarantine file next to an output file, e.g. emotion_vectors_quarantine.csv"""
+    stem, ext = os.path.splitext(output_path)
+    return f'{stem}_quarantine{ext or ".csv"}'
@@ -0,0 +1,245 @@
+import numpy as np
+import json
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from recommendation_query import (MOOD_TYPES, RECOMMENDATION_TYPES, BruteForceQueryEngine, CachedQueryEngine,
+                                  VectorCatalog)
+
+REFERENCE_BACKEND = 'brute_force'
+
+Query = Tuple[Dict[str, float], str]
+
+
+def synthetic_workload(queries: int, mood_weights: Optional[Dict[str, float]] = None,
+                       moods_per_query: Tuple[int, int] = (1, 3),
+                       intensity_range: Tuple[float, float] = (1, 10), intensity_step: float = 1.0,
+                       change_fraction: float = 0.2, seed: int = 0) -> List[Query]:
+    """
+    Random mood queries. Moods are drawn without replacement with probability
+    proportional to mood_weights (uniform by default), between moods_per_query
+    moods per query, with intensities snapped to intensity_step like the slider.
+    change_fraction of the queries ask for 'change' instead of 'match'.
+    """
+    weights = np.array([float((mood_weights or {}).get(mood, 0 if mood_weights else 1)) for mood in MOOD_TYPES])
+    if weights.sum() <= 0:
+        raise ValueError("mood_weights must give at least one mood a positive weight")
+    low_moods, high_moods = moods_per_query
+    high_moods = min(high_moods, int(np.count_nonzero(weights)))
+    if not 1 <= low_moods <= high_moods:
+        raise ValueError(f"Invalid moods_per_query: {moods_per_query}")
+
+    rng = np.random.default_rng(seed)
+    probabilities = weights / weights.sum()
+    low, high = intensity_range
+    workload = []
+    for _ in range(queries):
+        count = int(rng.integers(low_moods, high_moods + 1))
+        moods = rng.choice(len(MOOD_TYPES), size=count, replace=False, p=probabilities)
+        intensities = np.round(rng.uniform(low, high, size=count) / intensity_step) * intensity_step
+        emotions = {MOOD_TYPES[m]: float(np.clip(value, low, high)) for m, value in zip(moods, intensities)}
+        workload.append((emotions, 'change' if rng.random() < change_fraction else 'match'))
+    return workload
+
+
+def load_workload_log(log_path: str, limit: Optional[int] = None) -> List[Query]:
+    """
+    Replay a recorded JSON lines query log, each line like
+    {"emotions": {"happy": 7}, "type": "match"} (the CachedQueryEngine.warm format).
+    Malformed lines and lines with unknown moods or recommendation types are skipped.
+    """
+    workload = []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            # Skip malformed lines rather than abandoning the replay
+            try:
+                entry = json.loads(line)
+                emotions = dict(entry.get('emotions') or {})
+                recommendation_type = entry.get('type', 'match')
+            except (ValueError, TypeError, AttributeError):
+                continue
+            if any(mood not in MOOD_TYPES for mood in emotions) or recommendation_type not in RECOMMENDATION_TYPES:
+                continue
+            workload.append((emotions, recommendation_type))
+            if limit is not None and len(workload) >= limit:
+                break
+    return workload
+
+
+class QueryBackend:
+    """
+    A query engine under test. factory() builds a fresh engine and returns its
+    query callable (emotions, recommendation_type) -> results; backends that are
+    not thread_safe are called under a lock.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Callable], thread_safe: bool = True):
+        self.name = name
+        self.factory = factory
+        self.thread_safe = thread_safe
+
+
+def default_backends(vector_path: str, top_n: int = 100) -> List[QueryBackend]:
+    """The brute force reference scorer and the cached query layer"""
+    def brute_force():
+        engine = BruteForceQueryEngine(VectorCatalog(vector_path))
+        return lambda emotions, recommendation_type: engine.query(emotions, recommendation_type, top_n)
+
+    def cached():
+        return CachedQueryEngine(vector_path, top_n=top_n).query
+
+    return [
+        QueryBackend(REFERENCE_BACKEND, brute_force),
+        # ResultCache mutates an OrderedDict on every hit
+        QueryBackend('cached_lru', cached, thread_safe=False)
+    ]
+
+
+def _result_key(movie: Dict) -> Tuple:
+    return (movie.get('id'), movie.get('title'), movie.get('release_year'))
+
+
+def top_k_overlap(results: List[Dict], reference: List[Dict], k: int) -> float:
+    """Fraction of the reference top k also in the top k of results (1.0 when both are empty)"""
+    expected = {_result_key(movie) for movie in reference[:k]}
+    if not expected:
+        return 1.0 if not results else 0.0
+    found = {_result_key(movie) for movie in results[:k]}
+    return len(expected & found) / len(expected)
+
+
+def _timed_run(query: Callable, workload: List[Query], concurrency: int) -> Tuple[list, np.ndarray, int, float]:
+    results = [None] * len(workload)
+    latencies = np.zeros(len(workload))
+    errors = 0
+
+    def run_one(position: int):
+        emotions, recommendation_type = workload[position]
+        start = time.perf_counter()
+        try:
+            results[position] = query(emotions, recommendation_type)
+        except Exception:
+            results[position] = None
+            return False
+        finally:
+            latencies[position] = time.perf_counter() - start
+        return True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for succeeded in executor.map(run_one, range(len(workload))):
+            errors += not succeeded
+    return results, latencies, errors, time.perf_counter() - start
+
+
+def _memory_profile(backend: QueryBackend, workload: List[Query], sample: int) -> Dict:
+    """Traced Python/numpy allocations of a fresh engine: resident after build, and peak over sample queries"""
+    tracemalloc.start()
+    try:
+        query = backend.factory()
+        resident, _ = tracemalloc.get_traced_memory()
+        for emotions, recommendation_type in workload[:sample]:
+            try:
+                query(emotions, recommendation_type)
+            except Exception:
+                pass
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'resident_mb': round(resident / 2 ** 20, 2),
+        'retained_mb': round(current / 2 ** 20, 2),
+        'peak_mb': round(peak / 2 ** 20, 2)
+    }
+
+
+def run_load_test(backends: List[QueryBackend], workload: List[Query], concurrency: int = 8,
+                  k: int = 10, warmup: int = 0, memory_sample: int = 100) -> List[Dict]:
+    """
+    Replay workload against every backend at the given concurrency and report
+    throughput, latency percentiles, memory and top-k overlap with the brute
+    force reference (the backend named REFERENCE_BACKEND, or else the first one).
+
+    The first warmup queries are run once before timing. Memory is measured in a
+    separate untimed pass on a fresh engine, since tracing slows every allocation.
+    """
+    if not backends:
+        raise ValueError("No backends to test")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    names = [backend.name for backend in backends]
+    reference_name = REFERENCE_BACKEND if REFERENCE_BACKEND in names else names[0]
+    # Run the reference first so every other backend can be compared with it
+    backends = sorted(backends, key=lambda backend: backend.name != reference_name)
+
+    reference_results = None
+    reports = []
+    for backend in backends:
+        print(f'Running {len(workload)} queries against {backend.name} (concurrency {concurrency})...')
+        query = backend.factory()
+        if not backend.thread_safe:
+            lock = threading.Lock()
+            unsafe_query = query
+
+            def query(emotions, recommendation_type):
+                with lock:
+                    return unsafe_query(emotions, recommendation_type)
+
+        for emotions, recommendation_type in workload[:warmup]:
+            query(emotions, recommendation_type)
+
+        results, latencies, errors, seconds = _timed_run(query, workload, concurrency)
+        if backend.name == reference_name:
+            reference_results = results
+
+        overlaps = np.array([
+            top_k_overlap(result, expected, k)
+            for result, expected in zip(results, reference_results)
+            if result is not None and expected is not None
+        ])
+        latencies_ms = latencies * 1000
+        report = {
+            'backend': backend.name,
+            'queries': len(workload),
+            'concurrency': concurrency,
+            'errors': errors,
+            'seconds': round(seconds, 3),
+            'throughput_qps': round(len(workload) / seconds, 1) if seconds else 0.0,
+            'mean_ms': round(float(latencies_ms.mean()), 3) if len(workload) else 0.0,
+            'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3) if len(workload) else 0.0,
+            'p95_ms': round(float(np.percentile(latencies_ms, 95)), 3) if len(workload) else 0.0,
+            'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3) if len(workload) else 0.0,
+            'max_ms': round(float(latencies_ms.max()), 3) if len(workload) else 0.0,
+            f'overlap_at_{k}': round(float(overlaps.mean()), 4) if len(overlaps) else None,
+            f'min_overlap_at_{k}': round(float(overlaps.min()), 4) if len(overlaps) else None
+        }
+        report.update(_memory_profile(backend, workload, memory_sample))
+        reports.append(report)
+
+    return reports
+
+
+def print_load_report(reports: List[Dict]):
+    overlap_column = next((key for key in reports[0] if key.startswith('overlap_at_')), None) if reports else None
+    print(f"{'backend':<16}{'qps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'errors':>8}{'peak MB':>10}{'overlap':>9}")
+    for report in reports:
+        overlap = report.get(overlap_column)
+        print(f"{report['backend']:<16}{report['throughput_qps']:>10.1f}{report['p50_ms']:>10.2f}"
+              f"{report['p95_ms']:>10.2f}{report['p99_ms']:>10.2f}{report['errors']:>8}"
+              f"{report['peak_mb']:>10.1f}{overlap if overlap is not None else '-':>9}")
+
+
+# Example usage:
+if __name__ == '__main__':
+    vector_path = '../client/dataset/emotion_vectors_filtered.csv'
+    workload = synthetic_workload(2000, mood_weights={'happy': 3, 'romantic': 2, 'adventurous': 2, 'sad': 1,
+                                                      'peaceful': 1, 'excited': 1})
+    reports = run_load_test(default_backends(vector_path), workload, concurrency=8, k=10)
+    print_load_report(reports)
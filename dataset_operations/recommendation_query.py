@@ -0,0 +1,309 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+
+# Must match the order in emotion vectors (and moodTypes in server/routes.ts)
+MOOD_TYPES = [
+    'happy', 'sad', 'excited', 'romantic', 'angry',
+    'peaceful', 'curious', 'nostalgic', 'adventurous',
+    'hopeful', 'thoughtful', 'energetic'
+]
+
+OPPOSITE_EMOTIONS = {
+    'happy': 'sad',
+    'sad': 'happy',
+    'excited': 'peaceful',
+    'peaceful': 'excited',
+    'angry': 'peaceful',
+    'romantic': 'angry'
+}
+
+# Recommendation types accepted by the server
+RECOMMENDATION_TYPES = ['match', 'change']
+
+SIMILARITY_THRESHOLD = 0.5
+
+
+def artifact_fingerprint(path: str) -> Tuple[int, int]:
+    """Cheap fingerprint of a vector artifact (size, mtime) used for cache invalidation"""
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class VectorCatalog:
+    """Emotion vector catalog loaded from the analyzer output"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint = artifact_fingerprint(path)
+
+        df = pd.read_csv(path)
+        self.titles = df['title'].astype(str).tolist()
+        self.release_years = df['release_year'].tolist()
+        self.ids = df['id'].astype('Int64').tolist() if 'id' in df.columns else [None] * len(df)
+        self.vectors = np.array(
+            [json.loads(v) for v in df['emotion_vector']], dtype=np.float32
+        ).reshape(len(df), len(MOOD_TYPES))
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def movie(self, row: int) -> Dict:
+        return {
+            'id': self.ids[row],
+            'title': self.titles[row],
+            'release_year': self.release_years[row]
+        }
+
+
+def weighted_cosine_similarity(user_emotions: Dict[str, float], vectors: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of cosineSimilarity in server/routes.ts: selected emotions
+    weigh 2.5x, unselected 0.3x (halved when the movie scores them high), and
+    strong opposite emotions are penalized.
+    """
+    if not user_emotions:
+        return np.zeros(len(vectors), dtype=np.float32)
+
+    selected = np.array([mood in user_emotions for mood in MOOD_TYPES])
+    user_vector = np.array([user_emotions.get(mood, 0) / 10 for mood in MOOD_TYPES], dtype=np.float32)
+    movie_vectors = vectors / 10
+
+    weights = np.where(selected, 2.5, 0.3) * np.where(~selected & (movie_vectors > 0.6), 0.5, 1.0)
+
+    dot_product = (movie_vectors * user_vector * weights).sum(axis=1)
+    user_magnitude = np.sqrt((user_vector * user_vector * weights).sum(axis=1))
+    movie_magnitude = np.sqrt((movie_vectors * movie_vectors * weights).sum(axis=1))
+
+    denominator = user_magnitude * movie_magnitude
+    similarity = np.divide(dot_product, denominator, out=np.zeros_like(dot_product), where=denominator != 0)
+
+    penalty = np.ones(len(vectors), dtype=np.float32)
+    for emotion in user_emotions:
+        opposite = OPPOSITE_EMOTIONS.get(emotion)
+        if opposite:
+            opposite_value = movie_vectors[:, MOOD_TYPES.index(opposite)]
+            penalty *= np.where(opposite_value > 0.5, 1 - (opposite_value - 0.5), 1.0)
+
+    return similarity * penalty
+
+
+def emotions_for_type(user_emotions: Dict[str, float], recommendation_type: str) -> Dict[str, float]:
+    """Invert intensities for 'change' recommendations, as the server does"""
+    validate_recommendation_type(recommendation_type)
+    if recommendation_type == 'change':
+        return {mood: 10 - value for mood, value in user_emotions.items()}
+    return dict(user_emotions)
+
+
+def validate_emotions(user_emotions: Dict[str, float]):
+    unknown = [mood for mood in user_emotions if mood not in MOOD_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown moods: {', '.join(unknown)}")
+
+
+def validate_recommendation_type(recommendation_type: str):
+    if recommendation_type not in RECOMMENDATION_TYPES:
+        raise ValueError(f"Unknown recommendation type: {recommendation_type}")
+
+
+class BruteForceQueryEngine:
+    """Reference scorer: weighted cosine over the whole catalog for every query"""
+
+    def __init__(self, catalog: VectorCatalog):
+        self.catalog = catalog
+
+    def query(self, user_emotions: Dict[str, float], recommendation_type: str = 'match',
+              top_n: int = 100) -> List[Dict]:
+        validate_emotions(user_emotions)
+        emotions = emotions_for_type(user_emotions, recommendation_type)
+        similarity = weighted_cosine_similarity(emotions, self.catalog.vectors)
+
+        candidates = np.flatnonzero(similarity > SIMILARITY_THRESHOLD)
+        if len(candidates) > top_n:
+            candidates = candidates[np.argpartition(-similarity[candidates], top_n - 1)[:top_n]]
+        # Stable ordering: similarity descending, then catalog position
+        candidates = candidates[np.lexsort((candidates, -similarity[candidates]))]
+
+        return [
+            {**self.catalog.movie(row), 'similarity': round(float(similarity[row]), 4)}
+            for row in candidates
+        ]
+
+
+def quantize_query(user_emotions: Dict[str, float], recommendation_type: str = 'match',
+                   step: float = 1.0) -> Tuple:
+    """Canonical cache key: mood order independent, intensities snapped to the slider step"""
+    validate_emotions(user_emotions)
+    validate_recommendation_type(recommendation_type)
+    moods = tuple(sorted(
+        (mood, round(round(value / step) * step, 4)) for mood, value in user_emotions.items()
+    ))
+    return (recommendation_type, moods)
+
+
+class ResultCache:
+    """Size-capped result cache with an LRU or LFU eviction policy"""
+
+    def __init__(self, max_entries: int = 1024, policy: str = 'lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unsupported cache policy: {policy}")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._frequency = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        self._frequency[key] += 1
+        return self._entries[key]
+
+    def put(self, key, value):
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._frequency[key] = self._frequency.get(key, 0) + 1
+
+    def _evict(self):
+        if self.policy == 'lru':
+            key = next(iter(self._entries))
+        else:
+            # Least frequently used; ties go to the least recently used
+            key = min(self._entries, key=lambda k: self._frequency[k])
+        del self._entries[key]
+        del self._frequency[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._frequency.clear()
+
+
+def _freeze_results(results: List[Dict]) -> Tuple:
+    """Private copy of query results for the cache, so callers cannot mutate cached entries"""
+    return tuple(dict(movie) for movie in results)
+
+
+def _copy_results(cached: Tuple) -> List[Dict]:
+    return [dict(movie) for movie in cached]
+
+
+class CachedQueryEngine:
+    """
+    Query layer over an emotion vector artifact with a quantized-key result cache.
+
+    The cache is dropped automatically when the artifact's fingerprint changes.
+    """
+
+    def __init__(self, vector_path: str, top_n: int = 100, step: float = 1.0,
+                 max_entries: int = 1024, policy: str = 'lru'):
+        self.vector_path = vector_path
+        self.top_n = top_n
+        self.step = step
+        self.cache = ResultCache(max_entries, policy)
+        self._engine = BruteForceQueryEngine(VectorCatalog(vector_path))
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    @property
+    def catalog(self) -> VectorCatalog:
+        return self._engine.catalog
+
+    def _check_fingerprint(self):
+        if artifact_fingerprint(self.vector_path) != self.catalog.fingerprint:
+            print(f'Vector artifact changed, reloading {self.vector_path} and clearing cache')
+            self._engine = BruteForceQueryEngine(VectorCatalog(self.vector_path))
+            self.cache.clear()
+            self.invalidations += 1
+
+    def query(self, user_emotions: Dict[str, float], recommendation_type: str = 'match') -> List[Dict]:
+        start = time.perf_counter()
+        self._check_fingerprint()
+
+        key = quantize_query(user_emotions, recommendation_type, self.step)
+        cached = self.cache.get(key)
+        if cached is not None:
+            results = _copy_results(cached)
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - start
+            return results
+
+        # Score the canonical (quantized) query so every query sharing a key gets the same results
+        _, moods = key
+        results = self._engine.query(dict(moods), recommendation_type, self.top_n)
+        self.cache.put(key, _freeze_results(results))
+        self.misses += 1
+        self.miss_seconds += time.perf_counter() - start
+        return results
+
+    def warm(self, log_path: str, limit: Optional[int] = None) -> int:
+        """
+        Pre-populate the cache from a JSON lines log of popular queries, each line
+        like {"emotions": {"happy": 7}, "type": "match"}. Most frequent keys go first.
+        Warming does not count towards hit/miss metrics.
+        """
+        counts = {}
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                # Skip malformed lines rather than abandoning the warm-up
+                try:
+                    entry = json.loads(line)
+                    key = quantize_query(entry['emotions'], entry.get('type', 'match'), self.step)
+                except (KeyError, ValueError, TypeError, AttributeError):
+                    continue
+                counts[key] = counts.get(key, 0) + 1
+
+        popular = sorted(counts, key=counts.get, reverse=True)
+        popular = popular[:min(limit or self.cache.max_entries, self.cache.max_entries)]
+        for recommendation_type, moods in popular:
+            results = self._engine.query(dict(moods), recommendation_type, self.top_n)
+            self.cache.put((recommendation_type, moods), _freeze_results(results))
+
+        print(f'Warmed cache with {len(popular)} queries from {log_path}')
+        return len(popular)
+
+    def metrics(self) -> Dict:
+        requests = self.hits + self.misses
+        avg_hit = self.hit_seconds / self.hits if self.hits else 0.0
+        avg_miss = self.miss_seconds / self.misses if self.misses else 0.0
+        return {
+            'requests': requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'entries': len(self.cache),
+            'invalidations': self.invalidations,
+            'avg_hit_ms': avg_hit * 1000,
+            'avg_miss_ms': avg_miss * 1000,
+            # Time a miss would have cost for every hit, minus what the hits actually cost
+            'saved_seconds': max(avg_miss * self.hits - self.hit_seconds, 0.0) if self.misses else 0.0
+        }
+
+
+# Example usage:
+if __name__ == '__main__':
+    engine = CachedQueryEngine('../client/dataset/emotion_vectors_filtered.csv')
+    for intensity in (6.8, 7.2, 7.0):
+        results = engine.query({'happy': intensity, 'adventurous': 5}, 'match')
+        print([movie['title'] for movie in results[:5]])
+    print(engine.metrics())
@@ -0,0 +1,340 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from movie_emotion_analyzer import MovieEmotionAnalyzer, analyze_dataframe
+from movie_validation import validate_movies, combine_quarantine, quarantine_path_for
+
+SHARD_EXTENSIONS = ('.csv', '.parquet')
+MANIFEST_SUFFIX = '.manifest.json'
+MERGE_INDEX_SUFFIX = '.merge-index.json'
+MANIFEST_VERSION = 1
+SHARD_NAME_PATTERN = re.compile(r'^shard-(\d{5})-of-(\d{5})$')
+
+
+def shard_for_movie(movie_id: int, num_shards: int) -> int:
+    """Deterministic shard assignment by TMDB movie id"""
+    return int(movie_id) % num_shards
+
+
+def shard_name(shard_index: int, num_shards: int) -> str:
+    """Canonical shard file stem, e.g. shard-00003-of-00016"""
+    return f'shard-{shard_index:05d}-of-{num_shards:05d}'
+
+
+def partition_dataset(csv_path: str, shard_dir: str, num_shards: int, file_format: str = 'csv',
+                      quarantine_path: str = None) -> List[str]:
+    """
+    Split a movies dataset into num_shards input shards by movie id.
+
+    Rows without an integer id cannot be assigned a shard; they are written with
+    a 'quarantine_reason' to quarantine_path (default: next to shard_dir).
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be at least 1")
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported shard format: {file_format}")
+
+    df = pd.read_csv(csv_path)
+    if 'id' not in df.columns:
+        raise ValueError("Dataset must have an 'id' column to be sharded")
+
+    ids = pd.to_numeric(df['id'], errors='coerce')
+    invalid = ids.isna() | (ids % 1 != 0)
+    quarantine_df = df[invalid].assign(quarantine_reason='invalid id')
+    df = df[~invalid]
+    assignments = ids[~invalid].map(lambda movie_id: shard_for_movie(movie_id, num_shards))
+
+    os.makedirs(shard_dir, exist_ok=True)
+
+    paths = []
+    for shard_index in range(num_shards):
+        path = os.path.join(shard_dir, f'{shard_name(shard_index, num_shards)}.{file_format}')
+        shard_df = df[assignments == shard_index]
+        if file_format == 'parquet':
+            shard_df.to_parquet(path, index=False)
+        else:
+            shard_df.to_csv(path, index=False)
+        paths.append(path)
+
+    print(f'Partitioned {len(df)} movies into {num_shards} shards in {shard_dir}')
+    if len(quarantine_df):
+        # Kept out of shard_dir, where it would be read as another shard
+        quarantine_path = quarantine_path or quarantine_path_for(os.path.normpath(shard_dir))
+        quarantine_df.to_csv(quarantine_path, index=False, encoding='utf-8')
+        print(f'{len(quarantine_df)} rows without a valid id saved to {quarantine_path}')
+    return paths
+
+
+def list_shards(input_dir: str) -> List[str]:
+    """List input shard files (CSV or Parquet) in a directory, sorted by name"""
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.endswith(SHARD_EXTENSIONS)
+    )
+
+
+def read_shard(path: str) -> pd.DataFrame:
+    """Read a single input shard"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _input_fingerprint(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _write_atomic(path: str, write_fn):
+    """Write through a temporary file and rename, so readers on a shared filesystem never see partial output"""
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _select_shards(shard_paths: List[str], shards: Optional[List]) -> List[str]:
+    """Select shards by position or by file name/stem"""
+    if shards is None:
+        return shard_paths
+
+    selected = []
+    for shard in shards:
+        if isinstance(shard, int):
+            if not 0 <= shard < len(shard_paths):
+                raise ValueError(f"Shard index out of range: {shard}")
+            selected.append(shard_paths[shard])
+            continue
+        matches = [p for p in shard_paths
+                   if os.path.basename(p) == shard or os.path.splitext(os.path.basename(p))[0] == shard]
+        if not matches:
+            raise ValueError(f"Unknown shard: {shard}")
+        selected.extend(matches)
+    return selected
+
+
+def manifest_path_for(output_dir: str, input_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f'{stem}{MANIFEST_SUFFIX}')
+
+
+def output_path_for(output_dir: str, input_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f'{stem}.csv')
+
+
+def load_manifest(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def is_shard_complete(input_path: str, output_dir: str) -> bool:
+    """A shard is complete when its manifest matches the current input and its output is intact"""
+    manifest = load_manifest(manifest_path_for(output_dir, input_path))
+    if not manifest or manifest.get('input_fingerprint') != _input_fingerprint(input_path):
+        return False
+    output_path = os.path.join(output_dir, manifest['output_file'])
+    return os.path.exists(output_path) and _file_sha256(output_path) == manifest['output_sha256']
+
+
+def process_shard(input_path: str, output_dir: str, analyzer: MovieEmotionAnalyzer = None) -> Dict:
+    """Process one input shard, writing its emotion vectors and manifest entry"""
+    df, quarantine_df = validate_movies(read_shard(input_path))
+    print(f'Processing shard {os.path.basename(input_path)} ({len(df)} movies, {len(quarantine_df)} quarantined)...')
+
+    output_df, failed_df = analyze_dataframe(df, analyzer)
+    quarantine_df = combine_quarantine(quarantine_df, failed_df)
+    output_path = output_path_for(output_dir, input_path)
+    _write_atomic(output_path, lambda p: output_df.to_csv(
+        p, index=False, encoding='utf-8', float_format='%.2f'))
+
+    quarantine_path = quarantine_path_for(output_path)
+    if len(quarantine_df):
+        _write_atomic(quarantine_path, lambda p: quarantine_df.to_csv(p, index=False, encoding='utf-8'))
+    elif os.path.exists(quarantine_path):
+        os.remove(quarantine_path)
+
+    ids = output_df['id'].dropna()
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'kind': 'shard',
+        'shard': os.path.splitext(os.path.basename(input_path))[0],
+        'input_file': os.path.basename(input_path),
+        'input_fingerprint': _input_fingerprint(input_path),
+        'output_file': os.path.basename(output_path),
+        'output_sha256': _file_sha256(output_path),
+        'row_count': len(output_df),
+        'quarantine_count': len(quarantine_df),
+        'min_id': int(ids.min()) if len(ids) else None,
+        'max_id': int(ids.max()) if len(ids) else None,
+        'host': os.uname().nodename if hasattr(os, 'uname') else None,
+        'created_at': datetime.now().isoformat(timespec='seconds')
+    }
+    _write_atomic(manifest_path_for(output_dir, input_path), lambda p: _dump_json(manifest, p))
+    return manifest
+
+
+def _dump_json(data: Dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def process_shard_directory(input_dir: str, output_dir: str, shards: Optional[List] = None,
+                            force: bool = False) -> List[Dict]:
+    """
+    Process a subset of the input shards in input_dir.
+
+    Each shard writes its own output file and manifest, so different nodes can
+    process disjoint subsets against a shared output directory. Shards whose
+    manifest already matches the current input are skipped unless force is set.
+    """
+    shard_paths = list_shards(input_dir)
+    if not shard_paths:
+        raise ValueError(f"No CSV or Parquet shards found in {input_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    selected = _select_shards(shard_paths, shards)
+    analyzer = MovieEmotionAnalyzer()
+
+    manifests = []
+    for input_path in selected:
+        if not force and is_shard_complete(input_path, output_dir):
+            print(f'Skipping completed shard {os.path.basename(input_path)}')
+            manifests.append(load_manifest(manifest_path_for(output_dir, input_path)))
+            continue
+        try:
+            manifests.append(process_shard(input_path, output_dir, analyzer))
+        except Exception as e:
+            print(f"Error processing shard {os.path.basename(input_path)}: {str(e)}")
+
+    print(f'Processed {len(manifests)}/{len(selected)} selected shards into {output_dir}')
+    return manifests
+
+
+def _is_shard_manifest(manifest: Dict) -> bool:
+    # Manifests written before 'kind' existed are shard manifests unless they are a merge index
+    return manifest.get('kind', 'shard') == 'shard' and 'merged_file' not in manifest
+
+
+def _shard_manifest_files(output_dir: str, input_dir: Optional[str]) -> List[str]:
+    """
+    Manifests of the shards to merge: those of the input shards in input_dir, or
+    without it, a single complete shard-NNNNN-of-MMMMM set found in output_dir.
+    """
+    if input_dir is not None:
+        input_paths = list_shards(input_dir)
+        if not input_paths:
+            raise ValueError(f"No CSV or Parquet shards found in {input_dir}")
+        missing = [os.path.basename(p) for p in input_paths if not is_shard_complete(p, output_dir)]
+        if missing:
+            raise ValueError(f"Shards missing or stale: {', '.join(missing)}")
+        return [manifest_path_for(output_dir, p) for p in input_paths]
+
+    stems = sorted(name[:-len(MANIFEST_SUFFIX)] for name in os.listdir(output_dir)
+                   if name.endswith(MANIFEST_SUFFIX))
+    shard_sets = {}
+    for stem in stems:
+        match = SHARD_NAME_PATTERN.match(stem)
+        if match is None:
+            if _is_shard_manifest(load_manifest(os.path.join(output_dir, stem + MANIFEST_SUFFIX)) or {}):
+                raise ValueError(f"Shard {stem} is not named shard-NNNNN-of-MMMMM; pass input_dir to merge it")
+            continue
+        shard_sets.setdefault(int(match.group(2)), set()).add(int(match.group(1)))
+
+    if not shard_sets:
+        raise ValueError(f"No shard manifests found in {output_dir}")
+    if len(shard_sets) > 1:
+        counts = ', '.join(str(n) for n in sorted(shard_sets))
+        raise ValueError(f"Manifests from several shard counts ({counts}) in {output_dir}; pass input_dir")
+    (num_shards, found), = shard_sets.items()
+    missing = [shard_name(i, num_shards) for i in range(num_shards) if i not in found]
+    if missing:
+        raise ValueError(f"Shards missing: {', '.join(missing)}")
+    return [os.path.join(output_dir, shard_name(i, num_shards) + MANIFEST_SUFFIX) for i in range(num_shards)]
+
+
+def merge_shards(output_dir: str, merged_path: str, input_dir: Optional[str] = None) -> Dict:
+    """
+    Validate shard manifests and concatenate shard outputs into one vector file.
+
+    When input_dir is given exactly its input shards are merged, and each must
+    have a matching, complete manifest. Otherwise output_dir must hold one
+    complete set of canonically named shards. A merge index (row offsets per
+    shard) is written next to the merged file.
+    """
+    manifests = []
+    for path in _shard_manifest_files(output_dir, input_dir):
+        manifest = load_manifest(path)
+        if manifest is None:
+            raise ValueError(f"Unreadable manifest: {path}")
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version in {path}")
+        if not _is_shard_manifest(manifest):
+            raise ValueError(f"Not a shard manifest: {path}")
+        manifests.append(manifest)
+
+    frames = []
+    index = []
+    offset = 0
+    for manifest in manifests:
+        shard_output = os.path.join(output_dir, manifest['output_file'])
+        if not os.path.exists(shard_output):
+            raise ValueError(f"Missing shard output: {shard_output}")
+        if _file_sha256(shard_output) != manifest['output_sha256']:
+            raise ValueError(f"Checksum mismatch for shard output: {shard_output}")
+
+        shard_df = pd.read_csv(shard_output)
+        if len(shard_df) != manifest['row_count']:
+            raise ValueError(f"Row count mismatch for shard {manifest['shard']}")
+
+        frames.append(shard_df)
+        index.append({'shard': manifest['shard'], 'offset': offset, 'row_count': len(shard_df)})
+        offset += len(shard_df)
+
+    merged_df = pd.concat(frames, ignore_index=True)
+    merged_df['id'] = merged_df['id'].astype('Int64')
+    duplicated = merged_df['id'].dropna().duplicated()
+    if duplicated.any():
+        raise ValueError(f"Duplicate movie ids across shards: {duplicated.sum()}")
+
+    _write_atomic(merged_path, lambda p: merged_df.to_csv(
+        p, index=False, encoding='utf-8', float_format='%.2f'))
+
+    merge_index = {
+        'version': MANIFEST_VERSION,
+        'kind': 'merge_index',
+        'merged_file': os.path.basename(merged_path),
+        'row_count': len(merged_df),
+        'shards': index,
+        'created_at': datetime.now().isoformat(timespec='seconds')
+    }
+    _write_atomic(f'{os.path.splitext(merged_path)[0]}{MERGE_INDEX_SUFFIX}', lambda p: _dump_json(merge_index, p))
+    print(f'Merged {len(manifests)} shards ({len(merged_df)} movies) into {merged_path}')
+    return merge_index
+
+
+# Example usage:
+if __name__ == '__main__':
+    partition_dataset('../client/dataset/main_dataset.csv', '../client/dataset/shards', 16)
+    process_shard_directory('../client/dataset/shards', '../client/dataset/vector_shards')
+    merge_shards('../client/dataset/vector_shards', '../client/dataset/emotion_vectors.csv',
+                 input_dir='../client/dataset/shards')
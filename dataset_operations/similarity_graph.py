@@ -0,0 +1,213 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from id_index import sorted_id_index, lookup_id
+from recommendation_query import VectorCatalog
+
+GRAPH_VERSION = 1
+
+
+def graph_paths(output_prefix: str) -> Dict[str, str]:
+    """Files making up a neighbour graph written under output_prefix"""
+    return {
+        'meta': f'{output_prefix}.meta.json',
+        'indptr': f'{output_prefix}.indptr.npy',
+        'indices': f'{output_prefix}.indices.npy',
+        'scores': f'{output_prefix}.scores.npy',
+        'ids': f'{output_prefix}.ids.npy',
+        'sorted_ids': f'{output_prefix}.sorted_ids.npy',
+        'sorted_id_rows': f'{output_prefix}.sorted_id_rows.npy'
+    }
+
+
+def _unit_vectors(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so a dot product is cosine similarity (zero rows stay zero)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms != 0).astype(np.float32)
+
+
+def _merge_top_k(best_scores: np.ndarray, best_indices: np.ndarray,
+                 block_scores: np.ndarray, block_offset: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge a block of candidate scores into the running per-row top-k"""
+    block_indices = np.arange(block_offset, block_offset + block_scores.shape[1], dtype=np.int32)
+    scores = np.concatenate([best_scores, block_scores], axis=1)
+    indices = np.concatenate([best_indices, np.broadcast_to(block_indices, block_scores.shape)], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        indices = np.take_along_axis(indices, keep, axis=1)
+    return scores, indices
+
+
+def _top_k_block(unit: np.ndarray, start: int, stop: int, k: int, block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k neighbours (excluding self) for rows [start, stop), streaming over column blocks"""
+    queries = unit[start:stop]
+    rows = stop - start
+    best_scores = np.empty((rows, 0), dtype=np.float32)
+    best_indices = np.empty((rows, 0), dtype=np.int32)
+
+    for col_start in range(0, len(unit), block_size):
+        col_stop = min(col_start + block_size, len(unit))
+        block_scores = queries @ unit[col_start:col_stop].T
+
+        # Exclude each movie from its own neighbour list
+        overlap_start, overlap_stop = max(start, col_start), min(stop, col_stop)
+        if overlap_start < overlap_stop:
+            diagonal = np.arange(overlap_start, overlap_stop)
+            block_scores[diagonal - start, diagonal - col_start] = -np.inf
+
+        best_scores, best_indices = _merge_top_k(best_scores, best_indices, block_scores, col_start, k)
+
+    # Sort each row's neighbours by descending score
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_indices, order, axis=1)
+
+
+def build_similarity_graph(vector_path: str, output_prefix: str, k: int = 20, block_size: int = 2048,
+                           min_score: float = 0.0, workers: Optional[int] = None) -> Dict:
+    """
+    Build a top-k cosine neighbour graph over emotion vectors.
+
+    Rows are processed in blocks of block_size against column blocks of the same
+    size, so peak memory per worker is about block_size^2 scores plus the running
+    top-k. Row blocks run in parallel (numpy matmul releases the GIL). Neighbours
+    below min_score are dropped. The result is written as CSR arrays: indptr
+    (int64), indices (int32 catalog rows), scores (float16), plus the TMDB ids of
+    the catalog rows, all loadable with NeighborGraph via memory mapping.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+
+    start_time = time.perf_counter()
+    catalog = VectorCatalog(vector_path)
+    n = len(catalog)
+    k = min(k, max(n - 1, 0))
+    print(f'Building top-{k} similarity graph for {n} movies (block size {block_size})...')
+
+    unit = _unit_vectors(catalog.vectors)
+    paths = graph_paths(output_prefix)
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Padded (n, k) staging arrays on disk keep memory bounded for large catalogs
+    staging_indices_path = f'{output_prefix}.staging-indices.npy'
+    staging_scores_path = f'{output_prefix}.staging-scores.npy'
+    staging_indices = np.lib.format.open_memmap(staging_indices_path, mode='w+', dtype=np.int32, shape=(n, k))
+    staging_scores = np.lib.format.open_memmap(staging_scores_path, mode='w+', dtype=np.float16, shape=(n, k))
+    counts = np.zeros(n, dtype=np.int64)
+
+    def process_block(block_start: int) -> int:
+        block_stop = min(block_start + block_size, n)
+        scores, indices = _top_k_block(unit, block_start, block_stop, k, block_size)
+        keep = np.isfinite(scores) & (scores >= min_score)
+        counts[block_start:block_stop] = keep.sum(axis=1)
+        # Kept neighbours are a sorted prefix of each row
+        staging_indices[block_start:block_stop] = np.where(keep, indices, -1)
+        staging_scores[block_start:block_stop] = np.where(keep, scores, 0).astype(np.float16)
+        return block_stop - block_start
+
+    try:
+        block_starts = list(range(0, n, block_size)) if k > 0 else []
+        processed = 0
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            for block_number, rows in enumerate(executor.map(process_block, block_starts), 1):
+                processed += rows
+                # Show progress every 10 blocks
+                if block_number % 10 == 0 or processed == n:
+                    print(f'Processed {processed}/{n} movies ({processed / n * 100:.1f}%)')
+
+        # Compact the padded staging arrays into CSR, one block at a time
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        nnz = int(indptr[-1])
+        indices_out = np.lib.format.open_memmap(paths['indices'], mode='w+', dtype=np.int32, shape=(nnz,))
+        scores_out = np.lib.format.open_memmap(paths['scores'], mode='w+', dtype=np.float16, shape=(nnz,))
+        for block_start in range(0, n, block_size):
+            block_stop = min(block_start + block_size, n)
+            keep = staging_indices[block_start:block_stop] >= 0
+            indices_out[indptr[block_start]:indptr[block_stop]] = staging_indices[block_start:block_stop][keep]
+            scores_out[indptr[block_start]:indptr[block_stop]] = staging_scores[block_start:block_stop][keep]
+        indices_out.flush()
+        scores_out.flush()
+        del indices_out, scores_out
+    finally:
+        del staging_indices, staging_scores
+        for path in (staging_indices_path, staging_scores_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    np.save(paths['indptr'], indptr)
+    # Catalog rows without a TMDB id are stored as -1
+    ids = np.array([-1 if pd.isna(movie_id) else int(movie_id) for movie_id in catalog.ids], dtype=np.int64)
+    np.save(paths['ids'], ids)
+    sorted_ids, sorted_rows = sorted_id_index(ids)
+    np.save(paths['sorted_ids'], sorted_ids)
+    np.save(paths['sorted_id_rows'], sorted_rows)
+
+    meta = {
+        'version': GRAPH_VERSION,
+        'source': os.path.basename(vector_path),
+        'source_fingerprint': list(catalog.fingerprint),
+        'movies': n,
+        'k': k,
+        'min_score': min_score,
+        'edges': nnz,
+        'build_seconds': round(time.perf_counter() - start_time, 2)
+    }
+    with open(paths['meta'], 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f'Similarity graph saved to {output_prefix}.* ({nnz} edges, {meta["build_seconds"]}s)')
+    return meta
+
+
+class NeighborGraph:
+    """Memory-mapped top-k neighbour graph with lookups by catalog row or TMDB id (binary search)"""
+
+    def __init__(self, output_prefix: str):
+        paths = graph_paths(output_prefix)
+        with open(paths['meta'], 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != GRAPH_VERSION:
+            raise ValueError(f"Unsupported graph version in {paths['meta']}")
+
+        self.indptr = np.load(paths['indptr'], mmap_mode='r')
+        self.indices = np.load(paths['indices'], mmap_mode='r')
+        self.scores = np.load(paths['scores'], mmap_mode='r')
+        self.ids = np.load(paths['ids'], mmap_mode='r')
+        if os.path.exists(paths['sorted_ids']):
+            self._sorted_ids = np.load(paths['sorted_ids'], mmap_mode='r')
+            self._sorted_rows = np.load(paths['sorted_id_rows'], mmap_mode='r')
+        else:
+            # Graphs built before the sorted id index was stored
+            self._sorted_ids, self._sorted_rows = sorted_id_index(np.asarray(self.ids))
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def neighbors(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbour catalog rows and float16 scores for a catalog row, best first"""
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:stop], self.scores[start:stop]
+
+    def neighbors_by_id(self, movie_id: int) -> List[Tuple[int, float]]:
+        """(TMDB id, score) neighbours of a movie, best first; empty if the id is unknown"""
+        row = lookup_id(self._sorted_ids, self._sorted_rows, movie_id)
+        if row is None:
+            return []
+        indices, scores = self.neighbors(row)
+        return [(int(self.ids[i]), float(score)) for i, score in zip(indices, scores)]
+
+
+# Example usage:
+if __name__ == '__main__':
+    build_similarity_graph('../client/dataset/emotion_vectors_filtered.csv',
+                           '../client/dataset/similarity_graph/emotion_top20', k=20)
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from genre_bitmask import GENRES
+from movie_emotion_analyzer import MovieEmotionAnalyzer
+
+
+def sample_movies(count: int = 500, seed: int = 7):
+    """Synthetic movies covering genres, eras, text themes and structured fields"""
+    rng = random.Random(seed)
+    words = ['love', 'battle', 'journey', 'grief', 'mystery', 'family', 'memory', 'hope',
+             'war', 'chase', 'secret', 'dream', 'peace', 'friendship', 'revenge', 'quiet']
+    keywords = ['quest', 'fight', 'tragedy', 'conspiracy', 'joy', 'romance', 'space', 'heist']
+    movies = []
+    for movie_id in range(1, count + 1):
+        movies.append({
+            'id': movie_id,
+            'title': f'Movie {movie_id}',
+            'release_date': f'{rng.randint(1920, 2024)}-01-01',
+            'genres': ', '.join(name for _, name in rng.sample(GENRES, rng.randint(0, 3))),
+            'overview': ' '.join(rng.choices(words, k=rng.randint(0, 12))),
+            'tagline': ' '.join(rng.choices(words, k=rng.randint(0, 4))),
+            'keywords': ', '.join(rng.sample(keywords, rng.randint(0, 3))),
+            'runtime': rng.choice([0, 75, 95, 130, 170]),
+            'vote_average': round(rng.uniform(0, 9), 1),
+            'vote_count': rng.choice([0, 50, 500, 9000]),
+            'popularity': rng.choice([0, 5.0, 60.0, 150.0])
+        })
+    return movies
+
+
+def test_default_profile_matches_single_profile_scoring():
+    analyzer = MovieEmotionAnalyzer({'default': {}})
+    for movie in sample_movies():
+        assert analyzer.analyze_movie_profiles(movie)['default'] == analyzer.analyze_movie(movie)
+
+
+def test_explicit_default_overrides_do_not_change_scores():
+    reference = MovieEmotionAnalyzer()
+    analyzer = MovieEmotionAnalyzer({'explicit': {
+        'CONTENT_WEIGHTS': dict(reference.CONTENT_WEIGHTS),
+        'GENRE_EMOTIONS': {'Action': dict(reference.GENRE_EMOTIONS['Action'])},
+        'MOODS': {'happy': {'weight': reference.MOODS['happy']['weight']}}
+    }})
+    for movie in sample_movies(200):
+        assert analyzer.analyze_movie_profiles(movie)['explicit'] == reference.analyze_movie(movie)
+
+
+def test_profiles_are_scored_independently():
+    analyzer = MovieEmotionAnalyzer({
+        'default': {},
+        'genre_heavy': {'CONTENT_WEIGHTS': {'genre': 0.9}}
+    })
+    single = MovieEmotionAnalyzer({'genre_heavy': {'CONTENT_WEIGHTS': {'genre': 0.9}}})
+    for movie in sample_movies(200):
+        results = analyzer.analyze_movie_profiles(movie)
+        assert results['default'] == analyzer.analyze_movie(movie)
+        assert results['genre_heavy'] == single.analyze_movie_profiles(movie)['genre_heavy']
+
+
+def test_partial_overrides_keep_other_weights():
+    reference = MovieEmotionAnalyzer()
+    analyzer = MovieEmotionAnalyzer({'partial': {
+        'GENRE_EMOTIONS': {'Action': {'excited': 0.9}},
+        'ERA_WEIGHTS': {'nostalgic': {(1900, 1950): 0.95}},
+        'MOODS': {'sad': {'weight': 0.5}}
+    }})
+    profile = analyzer.profiles['partial']
+    assert profile['GENRE_EMOTIONS']['Action'] == {**reference.GENRE_EMOTIONS['Action'], 'excited': 0.9}
+    assert profile['ERA_WEIGHTS']['nostalgic'] == {**reference.ERA_WEIGHTS['nostalgic'], (1900, 1950): 0.95}
+    assert profile['MOODS']['sad']['keywords'] == reference.MOODS['sad']['keywords']
+    # Defaults are untouched
+    assert reference.GENRE_EMOTIONS['Action']['excited'] == 0.85
+
+
+@pytest.mark.parametrize('overrides', [
+    {'GENRE_EMOTIONS': {'Action': {'joyful': 0.9}}},
+    {'ERA_WEIGHTS': {'wistful': {(1900, 1960): 0.5}}},
+    {'GENRE_COMBINATIONS': {'space_romance': ([878, 10749], {'dreamy': 0.3})}},
+    {'CONTENT_WEIGHTS': {'keywords': 0.5}},
+    {'MOODS': {'joyful': {'weight': 0.5}}},
+    {'TITLE_WEIGHTS': {}}
+])
+def test_unknown_profile_names_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        MovieEmotionAnalyzer({'bad': overrides})
@@ -0,0 +1,183 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from id_index import sorted_id_index, lookup_id
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SIDECAR_VERSION = 1
+ROWS_PER_FRAME = 64
+
+
+def sidecar_paths(path_prefix: str) -> Dict[str, str]:
+    """Files making up a text sidecar, e.g. main_dataset_filtered.text.*"""
+    return {
+        'meta': f'{path_prefix}.text.json',
+        'data': f'{path_prefix}.text.bin',
+        'offsets': f'{path_prefix}.text.offsets.npy',
+        'ids': f'{path_prefix}.text.ids.npy',
+        'sorted_ids': f'{path_prefix}.text.sorted_ids.npy',
+        'sorted_id_rows': f'{path_prefix}.text.sorted_id_rows.npy'
+    }
+
+
+def default_codec() -> str:
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def _compressor(codec: str):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd codec requires the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress
+    if codec == 'zlib':
+        return lambda data: zlib.compress(data, 9)
+    raise ValueError(f"Unsupported codec: {codec}")
+
+
+def _decompressor(codec: str):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd codec requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == 'zlib':
+        return zlib.decompress
+    raise ValueError(f"Unsupported codec: {codec}")
+
+
+def write_text_sidecar(df: pd.DataFrame, columns: List[str], path_prefix: str,
+                       codec: Optional[str] = None, rows_per_frame: int = ROWS_PER_FRAME) -> Dict:
+    """
+    Write text columns of df to a compressed sidecar in df's row order.
+
+    Rows are grouped into independently compressed frames of rows_per_frame rows,
+    and a frame offset index allows reading any single row by decompressing only
+    its frame.
+    """
+    codec = codec or default_codec()
+    compress = _compressor(codec)
+    paths = sidecar_paths(path_prefix)
+
+    text = df[columns].fillna('').astype(str).values.tolist()
+    offsets = [0]
+    with open(paths['data'], 'wb') as f:
+        for frame_start in range(0, len(text), rows_per_frame):
+            frame = json.dumps(text[frame_start:frame_start + rows_per_frame], ensure_ascii=False)
+            offsets.append(offsets[-1] + f.write(compress(frame.encode('utf-8'))))
+    np.save(paths['offsets'], np.array(offsets, dtype=np.int64))
+    if 'id' in df.columns:
+        ids = df['id'].to_numpy(dtype=np.int64)
+        np.save(paths['ids'], ids)
+        # Sorted ids and their rows, so row_for_id can binary search
+        sorted_ids, sorted_rows = sorted_id_index(ids)
+        np.save(paths['sorted_ids'], sorted_ids)
+        np.save(paths['sorted_id_rows'], sorted_rows)
+    else:
+        for path in (paths['ids'], paths['sorted_ids'], paths['sorted_id_rows']):
+            if os.path.exists(path):
+                os.remove(path)
+
+    meta = {
+        'version': SIDECAR_VERSION,
+        'codec': codec,
+        'columns': columns,
+        'rows': len(text),
+        'rows_per_frame': rows_per_frame,
+        'has_ids': 'id' in df.columns
+    }
+    with open(paths['meta'], 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
+
+
+class TextSidecar:
+    """Random access reader for a text sidecar; only the frames holding requested rows are decompressed"""
+
+    def __init__(self, path_prefix: str, cache_frames: int = 16):
+        paths = sidecar_paths(path_prefix)
+        with open(paths['meta'], 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != SIDECAR_VERSION:
+            raise ValueError(f"Unsupported sidecar version in {paths['meta']}")
+
+        self.columns = self.meta['columns']
+        self.rows_per_frame = self.meta['rows_per_frame']
+        self._decompress = _decompressor(self.meta['codec'])
+        self._offsets = np.load(paths['offsets'], mmap_mode='r')
+        self._data = np.memmap(paths['data'], dtype=np.uint8, mode='r') if os.path.getsize(paths['data']) else None
+        self._ids = np.load(paths['ids'], mmap_mode='r') if self.meta['has_ids'] else None
+        self._sorted_ids = self._sorted_rows = None
+        if self._ids is not None:
+            if os.path.exists(paths['sorted_ids']):
+                self._sorted_ids = np.load(paths['sorted_ids'], mmap_mode='r')
+                self._sorted_rows = np.load(paths['sorted_id_rows'], mmap_mode='r')
+            else:
+                # Sidecars written before the sorted ids were stored
+                self._sorted_ids, self._sorted_rows = sorted_id_index(self._ids)
+        self._cache_frames = cache_frames
+        self._frames = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    def _frame(self, frame_index: int) -> List[List[str]]:
+        if frame_index in self._frames:
+            self._frames.move_to_end(frame_index)
+            return self._frames[frame_index]
+
+        start, stop = self._offsets[frame_index], self._offsets[frame_index + 1]
+        frame = json.loads(self._decompress(self._data[start:stop].tobytes()).decode('utf-8'))
+        self._frames[frame_index] = frame
+        if len(self._frames) > self._cache_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def row(self, row: int) -> Dict[str, str]:
+        """All text columns for a row of the main file"""
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row out of range: {row}")
+        values = self._frame(row // self.rows_per_frame)[row % self.rows_per_frame]
+        return dict(zip(self.columns, values))
+
+    def get(self, row: int, column: str) -> str:
+        return self.row(row)[column]
+
+    def rows(self, rows: Iterable[int], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Text for the given rows (in that order), decompressing each needed frame once"""
+        rows = list(rows)
+        columns = columns or self.columns
+        # Visit rows in order so each frame is decompressed once
+        by_row = {}
+        for row in sorted(set(rows)):
+            text = self.row(row)
+            by_row[row] = [text[column] for column in columns]
+        return pd.DataFrame([by_row[row] for row in rows], columns=columns, index=rows)
+
+    def row_for_id(self, movie_id: int) -> Optional[int]:
+        if self._ids is None:
+            raise ValueError("Sidecar was written without movie ids")
+        return lookup_id(self._sorted_ids, self._sorted_rows, movie_id)
+
+    def by_id(self, movie_id: int) -> Optional[Dict[str, str]]:
+        row = self.row_for_id(movie_id)
+        return self.row(row) if row is not None else None
+
+
+def attach_text(df: pd.DataFrame, path_prefix: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Add sidecar text columns to rows of a main file frame (e.g. only the rows
+    being displayed). df's index must be the row positions of the main file;
+    a row listed more than once gets its text each time.
+    """
+    sidecar = TextSidecar(path_prefix)
+    text = sidecar.rows(df.index, columns)
+    # Assign by position: joining on a repeated index would multiply rows
+    return df.assign(**{column: text[column].to_numpy() for column in text.columns})
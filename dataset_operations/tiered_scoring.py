@@ -0,0 +1,197 @@
+import pandas as pd
+import time
+from typing import Dict, Optional, Tuple
+
+from movie_emotion_analyzer import MovieEmotionAnalyzer, scoring_failure
+from movie_validation import validate_movies, combine_quarantine, quarantine_path_for
+
+TIER_FULL = 'full'
+TIER_STRUCTURED = 'structured'
+
+
+class TierPolicy:
+    """
+    Decides which movies get full text scoring.
+
+    A movie is promoted when its vote_count reaches min_vote_count or its
+    popularity reaches min_popularity (whichever are set; with neither set every
+    movie qualifies). full_budget caps the promoted rows to the most voted (then
+    most popular) ones.
+    """
+
+    def __init__(self, min_vote_count: Optional[float] = 100, min_popularity: Optional[float] = None,
+                 full_budget: Optional[int] = None):
+        if full_budget is not None and full_budget < 0:
+            raise ValueError("full_budget must not be negative")
+        self.min_vote_count = min_vote_count
+        self.min_popularity = min_popularity
+        self.full_budget = full_budget
+
+    def full_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Boolean mask of rows that get full text scoring (df as returned by validate_movies)"""
+        if self.min_vote_count is None and self.min_popularity is None:
+            mask = pd.Series(True, index=df.index)
+        else:
+            mask = pd.Series(False, index=df.index)
+            if self.min_vote_count is not None:
+                mask |= df['vote_count'] >= self.min_vote_count
+            if self.min_popularity is not None:
+                mask |= df['popularity'] >= self.min_popularity
+
+        if self.full_budget is not None and mask.sum() > self.full_budget:
+            ranked = df[mask].sort_values(['vote_count', 'popularity'], ascending=False, kind='stable')
+            mask = df.index.isin(ranked.index[:self.full_budget])
+            mask = pd.Series(mask, index=df.index)
+        return mask
+
+    def __repr__(self) -> str:
+        return (f'TierPolicy(min_vote_count={self.min_vote_count}, '
+                f'min_popularity={self.min_popularity}, full_budget={self.full_budget})')
+
+
+def _score_rows(df: pd.DataFrame, analyzer: MovieEmotionAnalyzer, text: bool) -> Tuple[Dict, list, float]:
+    """Results keyed by df index label, scoring failures (quarantine records) and elapsed seconds"""
+    start = time.perf_counter()
+    results = {}
+    failures = []
+    for label, movie in zip(df.index, df.to_dict('records')):
+        try:
+            result = analyzer.analyze_movie(movie, text=text)
+        except Exception as e:
+            failures.append(scoring_failure(movie, e))
+            continue
+        # Round emotion vector values to 2 decimal places
+        result['emotion_vector'] = [round(x, 2) for x in result['emotion_vector']]
+        result['tier'] = TIER_FULL if text else TIER_STRUCTURED
+        results[label] = result
+    return results, failures, time.perf_counter() - start
+
+
+def _tier_report(full_rows: int, structured_rows: int, full_seconds: float, structured_seconds: float) -> Dict:
+    total = full_rows + structured_rows
+    per_full_row = full_seconds / full_rows if full_rows else 0.0
+    # Estimated cost of scoring the structured rows with full text analysis instead
+    saved = max(per_full_row * structured_rows - structured_seconds, 0.0) if full_rows else None
+    return {
+        'rows': total,
+        'full_rows': full_rows,
+        'structured_rows': structured_rows,
+        'full_fraction': full_rows / total if total else 0.0,
+        'structured_fraction': structured_rows / total if total else 0.0,
+        'full_seconds': round(full_seconds, 3),
+        'structured_seconds': round(structured_seconds, 3),
+        'estimated_seconds_saved': round(saved, 3) if saved is not None else None
+    }
+
+
+def print_tier_report(report: Dict):
+    print(f"Full text scoring: {report['full_rows']} rows ({report['full_fraction']*100:.1f}%) "
+          f"in {report['full_seconds']:.2f}s")
+    print(f"Structured-only scoring: {report['structured_rows']} rows ({report['structured_fraction']*100:.1f}%) "
+          f"in {report['structured_seconds']:.2f}s")
+    if report['estimated_seconds_saved'] is not None:
+        print(f"Estimated time saved: {report['estimated_seconds_saved']:.2f}s")
+
+
+def analyze_dataframe_tiered(df: pd.DataFrame, policy: TierPolicy,
+                             analyzer: MovieEmotionAnalyzer = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    Score validated movies by tier; returns the vector frame (with a 'tier'
+    column), the rows that failed scoring (with a 'quarantine_reason') and a report.
+    """
+    analyzer = analyzer or MovieEmotionAnalyzer()
+    full = policy.full_mask(df)
+
+    full_results, full_failures, full_seconds = _score_rows(df[full], analyzer, text=True)
+    structured_results, structured_failures, structured_seconds = _score_rows(df[~full], analyzer, text=False)
+
+    # Restore input order
+    scored = {**full_results, **structured_results}
+    results = [scored[label] for label in df.index if label in scored]
+
+    output_df = pd.DataFrame(results, columns=['id', 'title', 'release_year', 'emotion_vector', 'tier'])
+    output_df['id'] = output_df['id'].astype('Int64')
+    failed_df = pd.DataFrame(full_failures + structured_failures, columns=[*df.columns, 'quarantine_reason'])
+    return output_df, failed_df, _tier_report(len(full_results), len(structured_results),
+                                              full_seconds, structured_seconds)
+
+
+def process_dataset_tiered(csv_path: str, output_path: str, policy: TierPolicy = None,
+                           quarantine_path: str = None) -> Optional[Dict]:
+    """Process movies dataset with tiered scoring and save emotion vectors with their tier"""
+    policy = policy or TierPolicy()
+    try:
+        df = pd.read_csv(csv_path)
+        clean_df, quarantine_df = validate_movies(df)
+        print(f'Processing {len(clean_df)} movies with {policy} ({len(quarantine_df)} quarantined)...')
+
+        output_df, failed_df, report = analyze_dataframe_tiered(clean_df, policy)
+        quarantine_df = combine_quarantine(quarantine_df, failed_df)
+        output_df.to_csv(output_path, index=False, encoding='utf-8', float_format='%.2f')
+        print(f'Emotion vectors successfully generated and saved to {output_path}')
+        print_tier_report(report)
+
+        if len(quarantine_df):
+            quarantine_path = quarantine_path or quarantine_path_for(output_path)
+            quarantine_df.to_csv(quarantine_path, index=False, encoding='utf-8')
+            print(f'Quarantined rows saved to {quarantine_path}')
+        return report
+
+    except Exception as e:
+        print(f"Error processing dataset: {str(e)}")
+        return None
+
+
+def upgrade_tiered_output(csv_path: str, output_path: str, policy: TierPolicy) -> Optional[Dict]:
+    """
+    Upgrade pass: re-score with full text analysis only the structured-tier rows
+    of an existing tiered output that the (typically looser) policy now promotes,
+    and rewrite the output in place.
+    """
+    try:
+        clean_df, _ = validate_movies(pd.read_csv(csv_path))
+        output_df = pd.read_csv(output_path)
+        output_df['id'] = output_df['id'].astype('Int64')
+        if 'tier' not in output_df.columns:
+            raise ValueError(f"{output_path} has no tier column")
+
+        # Promote rows that the policy selects and that are still structured-only
+        promoted = clean_df[policy.full_mask(clean_df)]
+        structured_ids = output_df.loc[output_df['tier'] == TIER_STRUCTURED, 'id']
+        promoted = promoted[promoted['id'].isin(structured_ids)]
+        print(f'Upgrading {len(promoted)} of {len(structured_ids)} structured-only rows to full scoring...')
+
+        results, failures, seconds = _score_rows(promoted, MovieEmotionAnalyzer(), text=True)
+        if failures:
+            # These keep their structured-only vectors
+            print(f'{len(failures)} rows failed full scoring and stay structured-only')
+        if results:
+            upgraded = pd.DataFrame(list(results.values())).set_index('id')
+            rows = output_df['id'].isin(upgraded.index)
+            output_df.loc[rows, 'emotion_vector'] = (
+                output_df.loc[rows, 'id'].map(upgraded['emotion_vector'].map(str)).to_numpy())
+            output_df.loc[rows, 'tier'] = TIER_FULL
+            output_df.to_csv(output_path, index=False, encoding='utf-8', float_format='%.2f')
+
+        full_rows = int((output_df['tier'] == TIER_FULL).sum())
+        report = {
+            'upgraded_rows': len(results),
+            'failed_rows': len(failures),
+            'upgrade_seconds': round(seconds, 3),
+            'full_rows': full_rows,
+            'structured_rows': len(output_df) - full_rows,
+            'full_fraction': full_rows / len(output_df) if len(output_df) else 0.0
+        }
+        print(f"Upgraded {report['upgraded_rows']} rows in {report['upgrade_seconds']:.2f}s; "
+              f"{report['full_fraction']*100:.1f}% of rows now fully scored")
+        return report
+
+    except Exception as e:
+        print(f"Error upgrading tiered output: {str(e)}")
+        return None
+
+
+# Example usage:
+if __name__ == '__main__':
+    process_dataset_tiered('../client/dataset/main_dataset.csv', '../client/dataset/emotion_vectors.csv',
+                           TierPolicy(min_vote_count=100))
@@ -0,0 +1,295 @@
+import pandas as pd
+import numpy as np
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from text_sidecar import TextSidecar, sidecar_paths
+
+INDEX_VERSION = 3
+SEARCH_THRESHOLDS = [0.6, 0.4]
+# Scores closer than this count as ties broken by release year distance
+YEAR_TIE_EPSILON = 0.01
+
+
+def index_paths(output_prefix: str) -> Dict[str, str]:
+    """Files making up a title search index written under output_prefix"""
+    return {
+        'meta': f'{output_prefix}.meta.json',
+        'vocab': f'{output_prefix}.vocab.npy',
+        'indptr': f'{output_prefix}.indptr.npy',
+        'postings': f'{output_prefix}.postings.npy',
+        'lengths': f'{output_prefix}.lengths.npy',
+        'length_offsets': f'{output_prefix}.length_offsets.npy',
+        'years': f'{output_prefix}.years.npy',
+        'ids': f'{output_prefix}.ids.npy',
+        'title_offsets': f'{output_prefix}.title_offsets.npy',
+        'titles': f'{output_prefix}.titles.npy'
+    }
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    title = unicodedata.normalize('NFKD', str(title))
+    title = ''.join(c for c in title if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^\w]+', ' ', title).split())
+
+
+def title_trigrams(normalized: str) -> set:
+    """Word trigrams, each word padded with two leading spaces and one trailing space"""
+    grams = set()
+    for word in normalized.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_codes(grams: set) -> np.ndarray:
+    """Trigrams packed into int64 codes (21 bits per code point), sorted"""
+    codes = [(ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2]) for gram in grams]
+    return np.sort(np.array(codes, dtype=np.int64))
+
+
+def load_titles(source: str) -> pd.DataFrame:
+    """
+    Read id, title and release_year from an emotion vector CSV, or from a filtered
+    main file whose titles live in its text sidecar (main_dataset_filtered.csv).
+    """
+    df = pd.read_csv(source)
+    if 'title' not in df.columns:
+        prefix = os.path.splitext(source)[0]
+        if not os.path.exists(sidecar_paths(prefix)['meta']):
+            raise ValueError(f"No title column or text sidecar for {source}")
+        sidecar = TextSidecar(prefix)
+        df['title'] = sidecar.rows(range(len(df)), ['title'])['title'].to_numpy()
+
+    titles = pd.DataFrame({
+        'id': df['id'].astype('Int64') if 'id' in df.columns else pd.array([pd.NA] * len(df), dtype='Int64'),
+        'title': df['title'].fillna('').astype(str),
+        'release_year': pd.to_numeric(df.get('release_year'), errors='coerce')
+    })
+    return titles
+
+
+def build_title_index(source: str, output_prefix: str) -> Dict:
+    """
+    Build a trigram inverted index over normalized titles.
+
+    Everything is written as .npy arrays (sorted trigram codes, CSR postings
+    of int32 index rows, per-title trigram counts, years, ids and UTF-8 titles)
+    so TitleIndex can memory-map them. Index rows are ordered by trigram count
+    (then catalog position), so the titles of a given length range are one
+    contiguous slice of every postings list; length_offsets locates it.
+    """
+    start_time = time.perf_counter()
+    titles = load_titles(source)
+    n = len(titles)
+    print(f'Building title index for {n} movies...')
+
+    gram_codes = []
+    doc_ids = array('i')
+    lengths = np.zeros(n, dtype=np.int16)
+    for row, title in enumerate(titles['title']):
+        codes = trigram_codes(title_trigrams(normalize_title(title)))
+        lengths[row] = min(len(codes), np.iinfo(np.int16).max)
+        gram_codes.append(codes)
+        doc_ids.extend([row] * len(codes))
+
+    # Order index rows by trigram count, keeping catalog order within a length
+    row_order = np.argsort(lengths, kind='stable')
+    index_row = np.empty(n, dtype=np.int32)
+    index_row[row_order] = np.arange(n, dtype=np.int32)
+    titles = titles.iloc[row_order].reset_index(drop=True)
+    lengths = lengths[row_order]
+    length_offsets = np.searchsorted(lengths, np.arange(int(lengths.max(initial=0)) + 2)).astype(np.int64)
+
+    # Number trigrams in code order so queries can binary search the vocabulary
+    gram_codes = np.concatenate(gram_codes) if gram_codes else np.empty(0, dtype=np.int64)
+    vocab, gram_ranks = np.unique(gram_codes, return_inverse=True)
+    gram_ranks = gram_ranks.reshape(-1)
+    doc_rows = index_row[np.frombuffer(doc_ids, dtype=np.int32)] if len(doc_ids) else np.empty(0, dtype=np.int32)
+    # Rows ascending within each trigram
+    postings = doc_rows[np.lexsort((doc_rows, gram_ranks))]
+    indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(gram_ranks, minlength=len(vocab)), out=indptr[1:])
+
+    encoded = [title.encode('utf-8') for title in titles['title']]
+    title_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(title) for title in encoded], out=title_offsets[1:])
+
+    paths = index_paths(output_prefix)
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.save(paths['vocab'], vocab)
+    np.save(paths['indptr'], indptr)
+    np.save(paths['postings'], postings.astype(np.int32))
+    np.save(paths['lengths'], lengths)
+    np.save(paths['length_offsets'], length_offsets)
+    np.save(paths['years'], titles['release_year'].fillna(0).astype(np.int16).to_numpy())
+    np.save(paths['ids'], titles['id'].fillna(-1).astype(np.int64).to_numpy())
+    np.save(paths['title_offsets'], title_offsets)
+    np.save(paths['titles'], np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    meta = {
+        'version': INDEX_VERSION,
+        'source': os.path.basename(source),
+        'titles': n,
+        'trigrams': len(vocab),
+        'postings': len(postings),
+        'build_seconds': round(time.perf_counter() - start_time, 2)
+    }
+    with open(paths['meta'], 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f'Title index saved to {output_prefix}.* ({len(vocab)} trigrams, {meta["build_seconds"]}s)')
+    return meta
+
+
+class TitleIndex:
+    """Memory-mapped trigram title index with ranked fuzzy search"""
+
+    def __init__(self, output_prefix: str):
+        paths = index_paths(output_prefix)
+        with open(paths['meta'], 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version in {paths['meta']}")
+
+        self.vocab = np.load(paths['vocab'], mmap_mode='r')
+        self.indptr = np.load(paths['indptr'], mmap_mode='r')
+        self.postings = np.load(paths['postings'], mmap_mode='r')
+        self.lengths = np.load(paths['lengths'], mmap_mode='r')
+        self.length_offsets = np.load(paths['length_offsets'], mmap_mode='r')
+        self.years = np.load(paths['years'], mmap_mode='r')
+        self.ids = np.load(paths['ids'], mmap_mode='r')
+        self.title_offsets = np.load(paths['title_offsets'], mmap_mode='r')
+        self.titles = np.load(paths['titles'], mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def title(self, row: int) -> str:
+        start, stop = self.title_offsets[row], self.title_offsets[row + 1]
+        return self.titles[start:stop].tobytes().decode('utf-8')
+
+    def _postings(self, grams: set) -> List[np.ndarray]:
+        """Postings lists of the query trigrams found in the vocabulary"""
+        codes = trigram_codes(grams)
+        positions = np.minimum(np.searchsorted(self.vocab, codes), len(self.vocab) - 1)
+        positions = positions[self.vocab[positions] == codes] if len(self.vocab) else positions[:0]
+        return [self.postings[self.indptr[position]:self.indptr[position + 1]] for position in positions]
+
+    def _length_window(self, query_size: int, threshold: float) -> Tuple[int, int]:
+        """Index rows whose trigram count allows a Jaccard score >= threshold"""
+        # Jaccard <= min(q, L) / max(q, L), so threshold * q <= L <= q / threshold
+        max_length = len(self.length_offsets) - 1
+        shortest = min(max(math.ceil(threshold * query_size - 1e-9), 0), max_length)
+        longest = min(math.floor(query_size / threshold + 1e-9) + 1, max_length)
+        return int(self.length_offsets[shortest]), int(self.length_offsets[longest])
+
+    def _count_shared(self, query_size: int, lists: List[np.ndarray],
+                      threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows that could score >= threshold, with the number of query trigrams each shares"""
+        # Only titles of a compatible length can qualify; they are a contiguous row
+        # range, so each postings list is cut down to it with two binary searches
+        first_row, stop_row = self._length_window(query_size, threshold)
+        lists = sorted((postings[np.searchsorted(postings, first_row):np.searchsorted(postings, stop_row)]
+                        for postings in lists), key=len)
+
+        # A title scoring >= threshold shares at least `required` trigrams with the
+        # query, so it must contain one of the rarest len(lists) - required + 1 of
+        # them. Candidates come from those; the common trigrams are only probed,
+        # unless the candidates are dense enough that counting every posting of
+        # the window is cheaper.
+        required = max(1, math.ceil(threshold * query_size - 1e-9))
+        if len(lists) < required:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        candidate_lists = lists[:len(lists) - required + 1]
+        probe_lists = lists[len(candidate_lists):]
+        candidates = np.concatenate(candidate_lists)
+        total = len(candidates) + sum(len(postings) for postings in probe_lists)
+        if len(candidates) * (len(probe_lists) + 8) > total + (stop_row - first_row):
+            shared = np.bincount(np.concatenate(lists) - first_row, minlength=stop_row - first_row)
+            rows = (np.flatnonzero(shared >= required) + first_row).astype(np.int32)
+            shared = shared[rows - first_row]
+            probe_lists = []
+        else:
+            rows, shared = np.unique(candidates, return_counts=True)
+
+        for remaining, postings in zip(range(len(probe_lists), 0, -1), probe_lists):
+            # Drop rows that cannot reach `required` even if every remaining list matches
+            viable = shared + remaining >= required
+            rows, shared = rows[viable], shared[viable]
+            if len(postings) == 0 or len(rows) == 0:
+                continue
+            # Binary search the shorter of the two sorted arrays into the longer
+            if len(postings) < len(rows):
+                positions = np.minimum(np.searchsorted(rows, postings), len(rows) - 1)
+                shared = shared.copy()
+                shared[positions[rows[positions] == postings]] += 1
+            else:
+                positions = np.minimum(np.searchsorted(postings, rows), len(postings) - 1)
+                shared = shared + (postings[positions] == rows)
+        return rows, shared
+
+    def search(self, query: str, limit: int = 10, year: Optional[int] = None,
+               min_score: float = 0.2) -> List[Dict]:
+        """
+        Ranked fuzzy title matches by trigram Jaccard similarity. When year is
+        given, titles within YEAR_TIE_EPSILON of each other prefer the release
+        closest to year; a title never overtakes one scoring more than that higher.
+        """
+        grams = title_trigrams(normalize_title(query))
+        if not grams or limit < 1:
+            return []
+        query_size = len(grams)
+
+        # Count shared trigrams once at min_score, then keep the strictest
+        # threshold that still leaves `limit` titles. With a year, a title below
+        # the threshold could still win a near tie, so require a margin above it.
+        rows, shared = self._count_shared(query_size, self._postings(grams), min_score)
+        scores = shared / (query_size + self.lengths[rows].astype(np.float64) - shared)
+        margin = YEAR_TIE_EPSILON if year is not None else 0.0
+        for threshold in [t for t in SEARCH_THRESHOLDS if t > min_score] + [min_score]:
+            if np.count_nonzero(scores >= threshold + margin) >= limit:
+                break
+        keep = scores >= threshold
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) == 0:
+            return []
+
+        if year is not None:
+            # Bounded penalty growing with year distance: decides near ties only
+            year_distance = np.abs(self.years[rows].astype(np.float64) - year)
+            keys = scores - YEAR_TIE_EPSILON * year_distance / (year_distance + 1)
+        else:
+            keys = scores
+        if len(rows) > limit:
+            # Narrow to the best keys (keeping ties at the cut) before the full sort
+            cutoff = -np.partition(-keys, limit - 1)[limit - 1]
+            best = keys >= cutoff
+            rows, scores, keys = rows[best], scores[best], keys[best]
+        order = np.lexsort((rows, -keys))[:limit]
+
+        return [
+            {
+                'id': int(self.ids[row]) if self.ids[row] >= 0 else None,
+                'title': self.title(row),
+                'release_year': int(self.years[row]) or None,
+                'score': round(float(score), 4)
+            }
+            for row, score in zip(rows[order], scores[order])
+        ]
+
+
+# Example usage:
+if __name__ == '__main__':
+    build_title_index('../client/dataset/emotion_vectors_filtered.csv', '../client/dataset/title_index/titles')
+    index = TitleIndex('../client/dataset/title_index/titles')
+    print(index.search('interstelar'))
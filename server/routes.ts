@@ -28,6 +28,7 @@ export const moodTypes = [
 export type MoodType = typeof moodTypes[number];
 
 interface MovieVector {
+  id?: number;
   title: string;
   release_year: number;
   emotion_vector: number[];
@@ -229,7 +230,11 @@ async function readEmotionVectors(): Promise<MovieVector[]> {
               return;
             }
 
+            // Older vector files have no id column; fall back to title search for those
+            const id = record.id ? parseInt(record.id, 10) : NaN;
+
             vectors.push({
+              id: isNaN(id) ? undefined : id,
               title: record.title,
               release_year: parseInt(record.release_year),
               emotion_vector: record.emotion_vector
@@ -255,9 +260,45 @@ async function readEmotionVectors(): Promise<MovieVector[]> {
   }
 }
 
+// Function to fetch movie details from TMDB by id
+async function fetchMovieDetailsById(id: number): Promise<MovieDetails | null> {
+  const detailsUrl = `${TMDB_BASE_URL}/movie/${id}?api_key=${TMDB_API_KEY}`;
+  const detailsResponse = await fetch(detailsUrl);
+
+  if (!detailsResponse.ok) {
+    console.error(`TMDB details failed: ${detailsResponse.status} ${detailsResponse.statusText}`);
+    return null;
+  }
+
+  const details = await detailsResponse.json();
+  return {
+    id: details.id,
+    title: details.title,
+    overview: details.overview,
+    poster_path: details.poster_path,
+    release_date: details.release_date,
+    vote_average: details.vote_average,
+    genres: details.genres.map((g: any) => g.name)
+  };
+}
+
 // Function to fetch movie details from TMDB
-async function fetchMovieDetails(title: string, year: number): Promise<MovieDetails | null> {
+async function fetchMovieDetails(title: string, year: number, id?: number): Promise<MovieDetails | null> {
   try {
+    // Known TMDB id: skip the search round trip and go straight to details
+    if (id !== undefined) {
+      console.log(`Fetching details for movie id ${id}: ${title} (${year})`);
+      const details = await fetchMovieDetailsById(id).catch((error) => {
+        console.error(`Error fetching details for movie id ${id}:`, error);
+        return null;
+      });
+      if (details) {
+        return details;
+      }
+      // Stale or removed id (e.g. 404): fall back to the title/year search
+      console.log(`No details for movie id ${id}, searching by title instead`);
+    }
+
     console.log(`Fetching details for movie: ${title} (${year})`);
     const searchUrl = `${TMDB_BASE_URL}/search/movie?api_key=${TMDB_API_KEY}&query=${encodeURIComponent(title)}&year=${year}`;
     const searchResponse = await fetch(searchUrl);
@@ -272,24 +313,7 @@ async function fetchMovieDetails(title: string, year: number): Promise<MovieDeta
 
     if (searchData.results && searchData.results.length > 0) {
       const movie = searchData.results[0];
-      const detailsUrl = `${TMDB_BASE_URL}/movie/${movie.id}?api_key=${TMDB_API_KEY}`;
-      const detailsResponse = await fetch(detailsUrl);
-      
-      if (!detailsResponse.ok) {
-        console.error(`TMDB details failed: ${detailsResponse.status} ${detailsResponse.statusText}`);
-        return null;
-      }
-
-      const details = await detailsResponse.json();
-      return {
-        id: details.id,
-        title: details.title,
-        overview: details.overview,
-        poster_path: details.poster_path,
-        release_date: details.release_date,
-        vote_average: details.vote_average,
-        genres: details.genres.map((g: any) => g.name)
-      };
+      return await fetchMovieDetailsById(movie.id);
     }
     return null;
   } catch (error) {
@@ -380,7 +404,7 @@ async function findSimilarMovies(
     // Fetch movie details
     const movieDetails = await Promise.all(
       paginatedMovies.map(async movie => {
-        const details = await fetchMovieDetails(movie.title, movie.release_year);
+        const details = await fetchMovieDetails(movie.title, movie.release_year, movie.id);
         if (!details) return null;
 
         return {